@@ -0,0 +1,267 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from main import GameState, GameConstants
+from simulate import VirtualClock
+
+
+# ======================
+# 分位点スケッチ
+# ======================
+class QuantileSketch:
+    """対数ビンのヒストグラムで分位点を近似（相対誤差 alpha、結合可能）"""
+    def __init__(self, alpha=0.01, min_value=1e-3, max_value=1e5):
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.offset = math.floor(math.log(min_value) / self.log_gamma)
+        size = math.ceil(math.log(max_value) / self.log_gamma) - self.offset + 1
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.zeros = 0
+
+    def add(self, values):
+        """値の配列をまとめて追加"""
+        values = np.asarray(values, dtype=np.float64)
+        small = values < self.min_value
+        self.zeros += int(small.sum())
+        index = np.ceil(np.log(values[~small]) / self.log_gamma).astype(np.int64) - self.offset
+        index = np.clip(index, 0, len(self.counts) - 1)
+        self.counts += np.bincount(index, minlength=len(self.counts))
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.zeros += other.zeros
+        return self
+
+    @property
+    def count(self):
+        return self.zeros + int(self.counts.sum())
+
+    def quantile(self, q):
+        """q 分位点 (0〜1)、値が無ければ nan"""
+        total = self.count
+        if total == 0:
+            return float("nan")
+        rank = q * (total - 1)
+        if rank < self.zeros:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), rank - self.zeros, side="right"))
+        return 2 * self.gamma ** (index + self.offset) / (self.gamma + 1)
+
+
+# ======================
+# セッションの集計
+# ======================
+TIME_LEFT_BIN = 10
+TIME_LEFT_BINS = np.arange(0, GameConstants.MAX_TIME_LIMIT + TIME_LEFT_BIN, TIME_LEFT_BIN)
+
+
+def replay_session(record):
+    """記録を GameState で再生し、1ゲーム分の指標を返す"""
+    clock = VirtualClock()
+    game_state = GameState(record["card_count"], record["time_limit"], clock=clock, tone_player=None)
+    game_state.deck.cards = list(record["deck"])
+    first_match = np.nan
+    flip_times = []
+    for t, index in record["flips"]:
+        clock.now = t
+        game_state.flip_card(index)
+        flip_times.append(t)
+        if len(game_state.selected_cards) == 2:
+            if game_state.check_match():
+                if np.isnan(first_match):
+                    first_match = t
+            else:
+                game_state.reset_unmatched_cards()
+    clock.now = record.get("elapsed", flip_times[-1] if flip_times else 0.0)
+    return {
+        "card_count": game_state.card_count,
+        "time_limit": game_state.time_limit,
+        "elapsed": min(game_state.get_elapsed_time(), game_state.time_limit),
+        "flips": len(flip_times),
+        "matches": game_state.matches_found,
+        "complete": game_state.is_game_complete(),
+        "first_match": first_match,
+        "flip_time_left": game_state.time_limit - np.asarray(flip_times, dtype=np.float64),
+    }
+
+
+class SessionAggregate:
+    """盤面サイズごとの集計（部分集計どうしを結合できる）"""
+    def __init__(self):
+        self.sessions = 0
+        self.completed = 0
+        self.total_flips = 0
+        self.total_elapsed = 0.0
+        self.first_match = QuantileSketch()
+        self.elapsed = QuantileSketch()
+        self.flips = QuantileSketch()
+        # 残り時間ごとのめくり回数と、その残り時間帯にいた合計時間
+        self.flips_by_time_left = np.zeros(len(TIME_LEFT_BINS) - 1, dtype=np.int64)
+        self.exposure_by_time_left = np.zeros(len(TIME_LEFT_BINS) - 1)
+
+    def add(self, metrics):
+        """同じ盤面サイズの指標のリストをまとめて追加"""
+        elapsed = np.array([m["elapsed"] for m in metrics])
+        time_limit = np.array([m["time_limit"] for m in metrics], dtype=np.float64)
+        flips = np.array([m["flips"] for m in metrics])
+        first_match = np.array([m["first_match"] for m in metrics])
+
+        self.sessions += len(metrics)
+        self.completed += sum(m["complete"] for m in metrics)
+        self.total_flips += int(flips.sum())
+        self.total_elapsed += float(elapsed.sum())
+        self.first_match.add(first_match[~np.isnan(first_match)])
+        self.elapsed.add(elapsed)
+        self.flips.add(flips)
+
+        flip_time_left = np.concatenate([m["flip_time_left"] for m in metrics])
+        self.flips_by_time_left += np.histogram(flip_time_left, TIME_LEFT_BINS)[0]
+        # 各ゲームが残り時間 [end, start) の範囲にいた時間をビンごとに重ねる
+        start = time_limit[:, None]
+        end = (time_limit - elapsed)[:, None]
+        lo = TIME_LEFT_BINS[None, :-1]
+        hi = TIME_LEFT_BINS[None, 1:]
+        self.exposure_by_time_left += np.clip(np.minimum(hi, start) - np.maximum(lo, end), 0, None).sum(axis=0)
+
+    def merge(self, other):
+        self.sessions += other.sessions
+        self.completed += other.completed
+        self.total_flips += other.total_flips
+        self.total_elapsed += other.total_elapsed
+        self.first_match.merge(other.first_match)
+        self.elapsed.merge(other.elapsed)
+        self.flips.merge(other.flips)
+        self.flips_by_time_left += other.flips_by_time_left
+        self.exposure_by_time_left += other.exposure_by_time_left
+        return self
+
+    def flip_rate_by_time_left(self):
+        """残り時間帯ごとの毎秒めくり回数"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.flips_by_time_left / self.exposure_by_time_left
+
+
+def merge_aggregates(target, partial):
+    """{盤面サイズ: SessionAggregate} どうしを結合"""
+    for key, aggregate in partial.items():
+        if key in target:
+            target[key].merge(aggregate)
+        else:
+            target[key] = aggregate
+    return target
+
+
+def summarize_chunk(lines):
+    """記録の1チャンク（JSON の行のリスト）を集計"""
+    grouped = {}
+    for line in lines:
+        metrics = replay_session(json.loads(line))
+        grouped.setdefault(metrics["card_count"], []).append(metrics)
+    result = {}
+    for card_count, metrics in grouped.items():
+        result[card_count] = SessionAggregate()
+        result[card_count].add(metrics)
+    return result
+
+
+def _read_chunks(path, chunk_size):
+    with open(path, encoding="utf-8") as f:
+        lines = (line for line in f if line.strip())
+        while True:
+            chunk = list(itertools.islice(lines, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+def summarize_sessions(path, chunk_size=2000, workers=None):
+    """セッション記録をチャンクごとに並列に集計（メモリは同時に扱うチャンク数で決まる）"""
+    workers = workers or os.cpu_count() or 1
+    totals = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = _read_chunks(path, chunk_size)
+        pending = []
+        for chunk in chunks:
+            pending.append(executor.submit(summarize_chunk, chunk))
+            if len(pending) >= workers * 2:
+                merge_aggregates(totals, pending.pop(0).result())
+        for future in pending:
+            merge_aggregates(totals, future.result())
+    return totals
+
+
+# ======================
+# ゲーム結果（ランキング）の集計
+# ======================
+def summarize_results(db_path, chunk_size=50000):
+    """ランキングの記録を少しずつ読み出して設定ごとに集計"""
+    totals = {}
+    connection = sqlite3.connect(db_path)
+    try:
+        cursor = connection.execute("SELECT card_count, time_limit, score, time_used FROM scores")
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            data = np.array(rows, dtype=np.float64)
+            keys, inverse = np.unique(data[:, :2], axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+            for i, (card_count, time_limit) in enumerate(keys):
+                subset = data[inverse == i]
+                key = (int(card_count), int(time_limit))
+                entry = totals.setdefault(key, {"games": 0, "score_sum": 0.0,
+                                                "score": QuantileSketch(), "time_used": QuantileSketch()})
+                entry["games"] += len(subset)
+                entry["score_sum"] += float(subset[:, 2].sum())
+                entry["score"].add(subset[:, 2])
+                entry["time_used"].add(subset[:, 3])
+    finally:
+        connection.close()
+    return totals
+
+
+# ======================
+# コマンドライン
+# ======================
+def _print_sessions(totals):
+    for card_count, aggregate in sorted(totals.items()):
+        print(f"{card_count}枚: {aggregate.sessions}ゲーム  "
+              f"クリア率 {aggregate.completed / aggregate.sessions:.1%}  "
+              f"平均めくり/秒 {aggregate.total_flips / max(aggregate.total_elapsed, 1e-9):.2f}")
+        print(f"  最初にそろうまで: 中央値 {aggregate.first_match.quantile(0.5):.1f}秒  "
+              f"90% {aggregate.first_match.quantile(0.9):.1f}秒")
+        print(f"  めくり回数: 中央値 {aggregate.flips.quantile(0.5):.0f}  "
+              f"プレイ時間: 中央値 {aggregate.elapsed.quantile(0.5):.1f}秒")
+        rates = aggregate.flip_rate_by_time_left()
+        for lo, rate, exposure in zip(TIME_LEFT_BINS, rates, aggregate.exposure_by_time_left):
+            if exposure > 0:
+                print(f"    残り {lo:3d}〜{lo + TIME_LEFT_BIN:3d}秒: {rate:.2f} めくり/秒")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="セッション記録とゲーム結果の集計")
+    parser.add_argument("--sessions", default=GameConstants.SESSION_LOG_PATH, help="セッション記録ファイル")
+    parser.add_argument("--results", default=GameConstants.LEADERBOARD_PATH, help="ランキングのデータベース")
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    if os.path.exists(args.sessions):
+        _print_sessions(summarize_sessions(args.sessions, args.chunk_size, args.workers))
+    if os.path.exists(args.results):
+        for (card_count, time_limit), entry in sorted(summarize_results(args.results).items()):
+            print(f"{card_count}枚・制限{time_limit}秒: {entry['games']}ゲーム  "
+                  f"平均スコア {entry['score_sum'] / entry['games']:.2f}  "
+                  f"使用時間の中央値 {entry['time_used'].quantile(0.5):.1f}秒")
+
+
+if __name__ == "__main__":
+    main()
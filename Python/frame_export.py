@@ -0,0 +1,193 @@
+import argparse
+import os
+import struct
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# 画面を持たない環境でも pygame を使えるようにする（main より先に設定）
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from main import GameConstants, GameRenderer, GameState, board_screen_size
+from simulate import VirtualClock
+import session_log
+
+
+# 記録の時刻はめくった瞬間。GameManager は音が鳴り終わってから 0.5 秒後に裏返すので、
+# 2枚目をめくってから裏返すまでは音の長さ + 0.5 秒（simulate_session も同じ）
+FLIP_BACK_DELAY = GameConstants.DEFAULT_TONE_DURATION + 0.5
+
+
+# ======================
+# PNG エンコード
+# ======================
+def _png_chunk(kind, data):
+    return (struct.pack(">I", len(data)) + kind + data +
+            struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+
+def encode_png(rgb, width, height, level=6):
+    """RGB のバイト列を PNG に変換（zlib は GIL を解放するのでスレッドで並列化できる）"""
+    rows = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 0] = 0  # フィルターなし
+    rows[:, 1:] = np.frombuffer(rgb, dtype=np.uint8).reshape(height, width * 3)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + _png_chunk(b"IHDR", header) +
+            _png_chunk(b"IDAT", zlib.compress(rows.tobytes(), level)) +
+            _png_chunk(b"IEND", b""))
+
+
+def _write_png(path, rgb, width, height, level):
+    png = encode_png(rgb, width, height, level)
+    with open(path, "wb") as f:
+        f.write(png)
+    return png
+
+
+def _write_same(path, previous):
+    """直前と同じフレームはエンコードし直さずに書く"""
+    png = previous.result()
+    with open(path, "wb") as f:
+        f.write(png)
+    return png
+
+
+def _surface_bytes(surface):
+    if hasattr(pygame.image, "tobytes"):
+        return pygame.image.tobytes(surface, "RGB")
+    return pygame.image.tostring(surface, "RGB")
+
+
+# ======================
+# 記録の再生
+# ======================
+class ReplayPlayer:
+    """記録を仮想時計で進めて GameState を再現する"""
+    def __init__(self, record):
+        self.clock = VirtualClock()
+        self.game_state = GameState(record["card_count"], record["time_limit"],
+                                    clock=self.clock, tone_player=None)
+        self.game_state.deck.cards = list(record["deck"])
+        self.flips = deque(sorted(record["flips"]))
+        self.flip_back_at = None
+        last_flip = self.flips[-1][0] if self.flips else 0.0
+        self.end_time = max(record.get("elapsed", 0.0), last_flip + FLIP_BACK_DELAY)
+
+    def advance_to(self, t):
+        """時刻 t までのめくりと裏返しを反映"""
+        game_state = self.game_state
+        while True:
+            next_flip = self.flips[0][0] if self.flips else None
+            if self.flip_back_at is not None and (next_flip is None or self.flip_back_at <= next_flip):
+                if self.flip_back_at > t:
+                    break
+                self.clock.now = self.flip_back_at
+                game_state.reset_unmatched_cards()
+                self.flip_back_at = None
+                continue
+            if next_flip is None or next_flip > t:
+                break
+            flip_time, index = self.flips.popleft()
+            self.clock.now = flip_time
+            game_state.flip_card(index)
+            if len(game_state.selected_cards) == 2 and game_state.check_match() is False:
+                self.flip_back_at = flip_time + FLIP_BACK_DELAY
+        self.clock.now = t
+
+
+# ======================
+# フレーム書き出し
+# ======================
+class FrameExporter:
+    """GameRenderer で画面外に描画し、連番 PNG または RGB ストリームに書き出す"""
+    def __init__(self, fps=30, workers=None, png_level=1, scale=1.0):
+        self.fps = fps
+        self.scale = scale
+        self.workers = workers or os.cpu_count() or 1
+        self.png_level = png_level
+
+    def export(self, record, output, raw=False):
+        """記録を書き出し、フレーム数と画像サイズを返す"""
+        pygame.init()
+        width, height = board_screen_size(record["card_count"], scale=self.scale)
+        surface = pygame.Surface((width, height))
+        renderer = GameRenderer(surface, offscreen=True, scale=self.scale)
+        replay = ReplayPlayer(record)
+        frame_count = int(replay.end_time * self.fps) + 1
+
+        if raw:
+            stream = sys.stdout.buffer if output == "-" else open(output, "wb")
+        else:
+            os.makedirs(output, exist_ok=True)
+        pending = deque()
+        previous_rgb = previous = None
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for frame in range(frame_count):
+                    replay.advance_to(frame / self.fps)
+                    renderer.draw_game(replay.game_state)
+                    rgb = _surface_bytes(surface)
+                    if raw:
+                        stream.write(rgb)
+                        continue
+                    path = os.path.join(output, f"frame_{frame:06d}.png")
+                    if rgb == previous_rgb:
+                        previous = executor.submit(_write_same, path, previous)
+                    else:
+                        previous = executor.submit(_write_png, path, rgb, width, height, self.png_level)
+                    previous_rgb = rgb
+                    pending.append(previous)
+                    # エンコード待ちのフレーム数を制限してメモリを抑える
+                    while len(pending) > self.workers * 4:
+                        pending.popleft().result()
+                while pending:
+                    pending.popleft().result()
+        finally:
+            if raw and output != "-":
+                stream.close()
+        return frame_count, (width, height)
+
+
+# ======================
+# コマンドライン
+# ======================
+def main():
+    parser = argparse.ArgumentParser(description="ゲームの画面を連番 PNG / RGB ストリームに書き出す")
+    parser.add_argument("output", help="出力先ディレクトリ（--raw のときはファイル、- で標準出力）")
+    parser.add_argument("--log", default=GameConstants.SESSION_LOG_PATH, help="セッション記録ファイル")
+    parser.add_argument("--index", type=int, default=-1, help="記録中の何番目のゲームか")
+    parser.add_argument("--simulate", type=int, metavar="CARDS", help="記録の代わりに模擬ゲームを使う")
+    parser.add_argument("--time-limit", type=int, default=GameConstants.DEFAULT_TIME_LIMIT)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--scale", type=float, default=1.0, help="画面の拡大率")
+    parser.add_argument("--raw", action="store_true", help="RGB24 の生データを書き出す")
+    args = parser.parse_args()
+
+    if args.simulate:
+        from simulate import simulate_session
+        record = simulate_session(args.simulate, args.time_limit, seed=args.seed)
+    else:
+        record = list(session_log.iter_sessions(args.log))[args.index]
+
+    exporter = FrameExporter(args.fps, args.workers, scale=args.scale)
+    started = time.perf_counter()
+    frames, (width, height) = exporter.export(record, args.output, raw=args.raw)
+    spent = time.perf_counter() - started
+    duration = frames / args.fps
+    print(f"{frames}フレーム ({width}x{height}, {duration:.1f}秒分) を {spent:.2f}秒で書き出しました "
+          f"(実時間の {duration / max(spent, 1e-9):.1f} 倍)", file=sys.stderr)
+    if args.raw:
+        print(f"例: ffmpeg -f rawvideo -pix_fmt rgb24 -s {width}x{height} -r {args.fps} "
+              f"-i {args.output} replay.mp4", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+import argparse
+import asyncio
+import json
+
+from main import GameState, GameConstants
+
+
+# ======================
+# 通信プロトコル
+# ======================
+# 1行に1つの JSON メッセージを送る (TCP)
+#   クライアント → サーバー
+#     {"op": "join", "room": 名前, "cards": 16, "time_limit": 60, "players": 1}
+#     {"op": "flip", "index": カード番号}
+#     {"op": "leave"}
+#   サーバー → クライアント (状態の差分のみを送る)
+#     {"type": "joined", "room", "player", "cards", "time_limit", "players"}
+#     {"type": "start", "turn"}
+#     {"type": "flip", "index", "note", "player"}
+#     {"type": "match", "cards", "player", "scores"}
+#     {"type": "miss", "cards", "turn"}
+#     {"type": "turn", "turn"}            手番の時間切れ
+#     {"type": "end", "reason", "scores"}
+#     {"type": "error", "message"}
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_PLAYERS = 2
+WRITE_BUFFER_LIMIT = 64 * 1024
+
+
+def encode_message(message):
+    """メッセージを送信用のバイト列に変換"""
+    return (json.dumps(message, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class ProtocolError(Exception):
+    """クライアントの不正な操作"""
+
+
+def _int_field(message, key, default):
+    """メッセージの整数項目（bool や null・配列などは不正として扱う）"""
+    value = message.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ProtocolError(f"{key} は整数で指定してください")
+    return value
+
+
+# ======================
+# 対戦部屋
+# ======================
+class Room:
+    """1つのゲーム (GameState) を共有する部屋"""
+    def __init__(self, server, name, card_count, time_limit, seats, turn_limit=None):
+        if card_count not in (GameConstants.CARD_COUNT_4X4, GameConstants.CARD_COUNT_6X6):
+            raise ProtocolError("cards は 16 か 36 を指定してください")
+        if not GameConstants.MIN_TIME_LIMIT <= time_limit <= GameConstants.MAX_TIME_LIMIT:
+            raise ProtocolError("time_limit が範囲外です")
+        if not 1 <= seats <= MAX_PLAYERS:
+            raise ProtocolError("players は 1 か 2 を指定してください")
+        self.server = server
+        self.loop = server.loop
+        self.name = name
+        self.seats = seats
+        self.turn_limit = turn_limit
+        self.game_state = GameState(card_count, time_limit, clock=self.loop.time, tone_player=None)
+        self.players = []
+        self.scores = [0] * seats
+        self.turn = 0
+        self.started = False
+        self.finished = False
+        self.end_timer = None
+        self.turn_timer = None
+
+    def is_full(self):
+        return len(self.players) == self.seats
+
+    def broadcast(self, message):
+        """部屋の全員に差分を送信"""
+        data = encode_message(message)
+        for connection in self.players:
+            connection.send_raw(data)
+
+    def join(self, connection):
+        """プレイヤーを席に着かせ、満席なら開始"""
+        if self.is_full():
+            raise ProtocolError("部屋が満席です")
+        player = len(self.players)
+        self.players.append(connection)
+        connection.room = self
+        connection.player = player
+        connection.send({"type": "joined", "room": self.name, "player": player,
+                         "cards": self.game_state.card_count,
+                         "time_limit": self.game_state.time_limit, "players": self.seats})
+        if self.is_full():
+            self._start()
+
+    def leave(self, connection):
+        """プレイヤーの退出（対戦中なら終了）"""
+        if connection in self.players:
+            self.players.remove(connection)
+        connection.room = None
+        if self.started and not self.finished:
+            self._finish("left")
+        if not self.players:
+            self._cancel_timers()
+            self.server.remove_room(self)
+
+    def _start(self):
+        self.started = True
+        self.game_state.start_time = self.loop.time()
+        self.end_timer = self.loop.call_later(self.game_state.time_limit, self._on_time_up)
+        self._schedule_turn_timer()
+        self.broadcast({"type": "start", "turn": self.turn})
+
+    def _schedule_turn_timer(self):
+        if self.turn_limit is None:
+            return
+        if self.turn_timer is not None:
+            self.turn_timer.cancel()
+        self.turn_timer = self.loop.call_later(self.turn_limit, self._on_turn_timeout)
+
+    def _cancel_timers(self):
+        for timer in (self.end_timer, self.turn_timer):
+            if timer is not None:
+                timer.cancel()
+        self.end_timer = self.turn_timer = None
+
+    def _next_turn(self):
+        self.turn = (self.turn + 1) % self.seats
+        self._schedule_turn_timer()
+
+    def _on_time_up(self):
+        self.end_timer = None
+        if not self.finished:
+            self._finish("time_up")
+
+    def _on_turn_timeout(self):
+        self.turn_timer = None
+        if self.finished:
+            return
+        self.game_state.reset_unmatched_cards()
+        self._next_turn()
+        self.broadcast({"type": "turn", "turn": self.turn})
+
+    def _finish(self, reason):
+        self.finished = True
+        self._cancel_timers()
+        self.broadcast({"type": "end", "reason": reason, "scores": self.scores})
+
+    def flip(self, connection, index):
+        """カードをめくる（手番と時間制限を確認）"""
+        game_state = self.game_state
+        if not self.started or self.finished:
+            raise ProtocolError("ゲーム中ではありません")
+        if connection.player != self.turn:
+            raise ProtocolError("手番ではありません")
+        if game_state.is_time_up():
+            self._finish("time_up")
+            return
+        if (isinstance(index, bool) or not isinstance(index, int)
+                or not 0 <= index < game_state.card_count):
+            raise ProtocolError("カード番号が不正です")
+        if game_state.card_states[index] != "hidden":
+            raise ProtocolError("そのカードはめくれません")
+
+        game_state.flip_card(index)
+        self.server.flip_count += 1
+        self.broadcast({"type": "flip", "index": index,
+                        "note": game_state.deck.get_card(index), "player": self.turn})
+        if len(game_state.selected_cards) < 2:
+            return
+
+        cards = list(game_state.selected_cards)
+        if game_state.check_match():
+            self.scores[self.turn] += 1
+            self.broadcast({"type": "match", "cards": cards, "player": self.turn,
+                            "scores": self.scores})
+            self._schedule_turn_timer()
+            if game_state.is_game_complete():
+                self._finish("complete")
+        else:
+            game_state.reset_unmatched_cards()
+            self._next_turn()
+            self.broadcast({"type": "miss", "cards": cards, "turn": self.turn})
+
+
+# ======================
+# 接続
+# ======================
+class Connection:
+    """クライアント1つとの接続"""
+    def __init__(self, writer):
+        self.writer = writer
+        self.room = None
+        self.player = None
+
+    def send(self, message):
+        self.send_raw(encode_message(message))
+
+    def send_raw(self, data):
+        if not self.writer.is_closing():
+            self.writer.write(data)
+
+    def needs_drain(self):
+        return self.writer.transport.get_write_buffer_size() > WRITE_BUFFER_LIMIT
+
+
+# ======================
+# サーバー本体
+# ======================
+class GameServer:
+    """多数の部屋を1プロセスで管理するサーバー"""
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, turn_limit=None):
+        self.host = host
+        self.port = port
+        self.turn_limit = turn_limit
+        self.loop = None
+        self.rooms = {}
+        self.flip_count = 0
+        self.server = None
+
+    async def start(self):
+        """待ち受けを開始"""
+        self.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        self.server.close()
+
+    def remove_room(self, room):
+        if self.rooms.get(room.name) is room:
+            del self.rooms[room.name]
+
+    def _join(self, connection, message):
+        if connection.room is not None:
+            raise ProtocolError("すでに部屋に入っています")
+        name = message.get("room")
+        if not isinstance(name, str) or not name:
+            raise ProtocolError("room を指定してください")
+        room = self.rooms.get(name)
+        if room is None or room.finished:
+            room = Room(self, name,
+                        _int_field(message, "cards", GameConstants.CARD_COUNT_4X4),
+                        _int_field(message, "time_limit", GameConstants.DEFAULT_TIME_LIMIT),
+                        _int_field(message, "players", 1),
+                        self.turn_limit)
+            self.rooms[name] = room
+        room.join(connection)
+
+    def _dispatch(self, connection, message):
+        op = message.get("op")
+        if op == "flip":
+            if connection.room is None:
+                raise ProtocolError("部屋に入っていません")
+            connection.room.flip(connection, message.get("index"))
+        elif op == "join":
+            self._join(connection, message)
+        elif op == "leave":
+            if connection.room is not None:
+                connection.room.leave(connection)
+        else:
+            raise ProtocolError(f"不明な操作です: {op}")
+
+    async def _handle_client(self, reader, writer):
+        connection = Connection(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # 1行が読み込みの上限 (64 KiB) を超えた → 続きは読めないので切断
+                    connection.send({"type": "error", "message": "メッセージが長すぎます"})
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    if not isinstance(message, dict):
+                        raise ProtocolError("メッセージが不正です")
+                    self._dispatch(connection, message)
+                except (ValueError, ProtocolError) as e:
+                    connection.send({"type": "error", "message": str(e)})
+                if connection.needs_drain():
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if connection.room is not None:
+                connection.room.leave(connection)
+            writer.close()
+
+    async def report_stats(self, interval):
+        """一定間隔で部屋数と毎秒のめくり回数を表示"""
+        last = self.flip_count
+        while True:
+            await asyncio.sleep(interval)
+            rate = (self.flip_count - last) / interval
+            last = self.flip_count
+            print(f"部屋数: {len(self.rooms)}  めくり/秒: {rate:.0f}")
+
+
+# ======================
+# コマンドライン
+# ======================
+async def _serve(args):
+    server = await GameServer(args.host, args.port, args.turn_limit).start()
+    print(f"{server.host}:{server.port} で待ち受け中")
+    if args.stats:
+        asyncio.get_running_loop().create_task(server.report_stats(args.stats))
+    await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="音階神経衰弱の対戦サーバー")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--turn-limit", type=float, help="1手番の制限時間（秒）")
+    parser.add_argument("--stats", type=float, metavar="SECONDS", help="統計を表示する間隔")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
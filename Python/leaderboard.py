@@ -0,0 +1,234 @@
+import bisect
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+
+# ======================
+# ランキング（SQLite）
+# ======================
+# 順位: スコアが高い順、同点なら使った時間が短い順
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    card_count INTEGER NOT NULL,
+    time_limit INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    time_used REAL NOT NULL,
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_rank
+    ON scores (card_count, time_limit, score DESC, time_used);
+CREATE TABLE IF NOT EXISTS score_counts (
+    card_count INTEGER NOT NULL,
+    time_limit INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (card_count, time_limit, score)
+);
+"""
+
+INSERT_SCORE = """
+INSERT INTO scores (card_count, time_limit, score, time_used, played_at)
+VALUES (?, ?, ?, ?, ?)
+"""
+UPSERT_COUNT = """
+INSERT INTO score_counts (card_count, time_limit, score, count) VALUES (?, ?, ?, 1)
+ON CONFLICT (card_count, time_limit, score) DO UPDATE SET count = count + 1
+"""
+SELECT_TOP = """
+SELECT score, time_used FROM scores
+WHERE card_count = ? AND time_limit = ?
+ORDER BY score DESC, time_used
+LIMIT ?
+"""
+
+
+logger = logging.getLogger(__name__)
+
+# 他の接続がロックしているときの再試行（終了中でなければ書き込めるまで続ける）
+RETRY_DELAY = 0.05
+MAX_RETRY_DELAY = 2.0
+RETRIES_ON_CLOSE = 3
+
+
+def _is_locked(error):
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def _connect(path, check_same_thread=True):
+    connection = sqlite3.connect(path, check_same_thread=check_same_thread)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class Leaderboard:
+    """スコアをまとめて非同期に書き込むランキング"""
+    def __init__(self, path, top_n=10, batch_size=256, flush_interval=1.0):
+        self.path = path
+        self.top_n = top_n
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        # 読み出し用（複数スレッドから使うので _db_lock で守る）
+        self.connection = _connect(path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+        self.connection.commit()
+
+        self._queue = queue.Queue()
+        # _lock は登録とキャッシュだけを守り、ディスクを待つ間は持たない（submit を止めない）
+        # _db_lock はデータベースへの書き込み・読み出しを守る（取る順は _db_lock → _lock）
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._closing = False
+        self._unflushed = []
+        self._top_cache = {}  # (card_count, time_limit) → [(-score, time_used), ...]
+        self.failed_rows = 0  # 書き込みに失敗して失われた件数
+        self.last_error = None
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    # --- 書き込み ---
+    def submit(self, card_count, time_limit, score, time_used):
+        """スコアを登録（ディスクへの書き込みは別スレッドで行う）"""
+        row = (card_count, time_limit, score, round(time_used, 3), time.time())
+        with self._lock:
+            self._unflushed.append(row)
+            self._insert_cached(row)
+            self._queue.put(row)
+
+    def _write_loop(self):
+        try:
+            connection = _connect(self.path)
+        except sqlite3.Error as e:
+            # 開けなくてもキューは消化し続け、flush() が止まらないようにする
+            connection = None
+            self._record_failure(e, 0)
+        running = True
+        while running:
+            row = self._queue.get()
+            if row is None:
+                break
+            batch = [row]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    row = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if row is None:
+                    running = False
+                    break
+                batch.append(row)
+            try:
+                self._write_batch(connection, batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        if connection is not None:
+            connection.close()
+
+    def _write_batch(self, connection, batch):
+        """1回分をまとめて書き込む
+
+        ロック中なら待って再試行し、それ以外の失敗は記録して捨てる。
+        書き込みと _unflushed の削除は _db_lock の中で続けて行うので、
+        読み出し側から同じ記録が二重に見えることはない。
+        """
+        delay = RETRY_DELAY
+        attempt = 0
+        while True:
+            with self._db_lock:
+                try:
+                    if connection is None:
+                        raise sqlite3.OperationalError("ランキングのデータベースを開けませんでした")
+                    with connection:
+                        connection.executemany(INSERT_SCORE, batch)
+                        connection.executemany(UPSERT_COUNT, [r[:3] for r in batch])
+                    error = None
+                except sqlite3.Error as e:
+                    error = e
+                attempt += 1
+                retry = (error is not None and _is_locked(error)
+                         and not (self._closing and attempt > RETRIES_ON_CLOSE))
+                if not retry:
+                    if error is not None:
+                        self._record_failure(error, len(batch))
+                    with self._lock:
+                        del self._unflushed[:len(batch)]
+                    return
+            logger.warning("ランキングがロックされているので再試行します: %s", error)
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_DELAY)
+
+    def _record_failure(self, error, count):
+        self.failed_rows += count
+        self.last_error = error
+        logger.error("ランキングへの書き込みに失敗しました（%d 件）: %s", count, error)
+
+    def flush(self):
+        """登録済みのスコアが書き込まれるまで待つ"""
+        self._queue.join()
+
+    def close(self):
+        """書き込みを終えて閉じる"""
+        self._closing = True
+        self._queue.put(None)
+        self._writer.join()
+        self.connection.close()
+
+    # --- 読み出し ---
+    def _insert_cached(self, row):
+        cached = self._top_cache.get(row[:2])
+        if cached is None:
+            return
+        bisect.insort(cached, (-row[2], row[3]))
+        del cached[self.top_n:]
+
+    def top(self, card_count, time_limit, n=None):
+        """上位 n 件の (スコア, 使った時間) を返す"""
+        n = self.top_n if n is None else n
+        key = (card_count, time_limit)
+        if n > self.top_n:
+            self.flush()
+            with self._db_lock:
+                rows = self.connection.execute(SELECT_TOP, (*key, n)).fetchall()
+            return [(score, time_used) for score, time_used in rows]
+        cached = self._top_cache.get(key)
+        if cached is None:
+            with self._db_lock:
+                rows = self.connection.execute(SELECT_TOP, (*key, self.top_n)).fetchall()
+                with self._lock:
+                    cached = sorted([(-score, time_used) for score, time_used in rows] +
+                                    [(-r[2], r[3]) for r in self._unflushed if r[:2] == key])
+                    del cached[self.top_n:]
+                    self._top_cache[key] = cached
+        return [(-neg_score, time_used) for neg_score, time_used in cached[:n]]
+
+    def best(self, card_count, time_limit):
+        """最高記録 (スコア, 使った時間)、記録が無ければ None"""
+        top = self.top(card_count, time_limit, 1)
+        return top[0] if top else None
+
+    def percentile(self, card_count, time_limit, score, time_used):
+        """その記録より下位の記録の割合 (0〜100)"""
+        self.flush()
+        key = (card_count, time_limit)
+        with self._db_lock:
+            counts = self.connection.execute(
+                "SELECT score, count FROM score_counts WHERE card_count = ? AND time_limit = ?",
+                key).fetchall()
+            # 同点の中では使った時間で比べる（インデックスの範囲検索）
+            (slower,) = self.connection.execute(
+                "SELECT COUNT(*) FROM scores "
+                "WHERE card_count = ? AND time_limit = ? AND score = ? AND time_used > ?",
+                (*key, score, time_used)).fetchone()
+        total = sum(count for _, count in counts)
+        if total == 0:
+            return 100.0
+        below = sum(count for s, count in counts if s < score)
+        return 100.0 * (below + slower) / total
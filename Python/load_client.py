@@ -0,0 +1,165 @@
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from game_server import DEFAULT_HOST, DEFAULT_PORT, encode_message
+from main import GameConstants
+
+
+# ======================
+# 負荷試験クライアント
+# ======================
+# 目標値: 1コアのサーバーで数千部屋・毎秒数万回のめくり (localhost)
+TARGET_ROOMS = 2000
+TARGET_FLIPS_PER_SECOND = 20000
+TARGET_P99_LATENCY_MS = 50.0
+
+
+class BotPlayer:
+    """完全記憶でカードをめくり続けるクライアント"""
+    def __init__(self, host, port, name, card_count, time_limit, seats, stats, schedule=None):
+        self.host = host
+        self.port = port
+        self.name = name
+        self.card_count = card_count
+        self.time_limit = time_limit
+        self.seats = seats
+        self.stats = stats
+        # ゲーム番号 → 次のゲームを続けるか。同じ部屋のボットで共有し、
+        # 2人対戦で片方だけが次の部屋に入って相手を待ち続けないようにする
+        self.schedule = {} if schedule is None else schedule
+        self.games = 0
+
+    def _reset(self):
+        self.hidden = set(range(self.card_count))
+        self.seen = {}    # カード番号 → 音階
+        self.first = None
+        self.pending = None
+        self.resolving = False  # 2枚目の結果 (match/miss) 待ち
+
+    def _next_flip(self):
+        """次にめくるカードを選ぶ"""
+        if self.first is None:
+            # 音階の分かっているペアがあれば先にそろえる
+            notes = set()
+            for index in self.hidden:
+                note = self.seen.get(index)
+                if note in notes:
+                    return index
+                if note is not None:
+                    notes.add(note)
+        else:
+            note = self.seen.get(self.first)
+            for index in self.hidden:
+                if index != self.first and self.seen.get(index) == note:
+                    return index
+        candidates = [i for i in self.hidden if i != self.first]
+        unknown = [i for i in candidates if i not in self.seen]
+        return unknown[0] if unknown else candidates[0]
+
+    def _send_flip(self, writer):
+        index = self._next_flip()
+        self.pending = time.perf_counter()
+        writer.write(encode_message({"op": "flip", "index": index}))
+
+    async def run(self, deadline):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            while self._continues(deadline):
+                await self._play_one(reader, writer, f"{self.name}-{self.games}")
+                self.games += 1
+        finally:
+            writer.close()
+
+    def _continues(self, deadline):
+        """次のゲームを続けるか（部屋で最初に決めたボットの判断に従う）"""
+        decision = self.schedule.get(self.games)
+        if decision is None:
+            decision = self.schedule[self.games] = time.perf_counter() < deadline
+        return decision
+
+    async def _play_one(self, reader, writer, room):
+        self._reset()
+        me = None
+        turn = None
+        writer.write(encode_message({"op": "join", "room": room, "cards": self.card_count,
+                                     "time_limit": self.time_limit, "players": self.seats}))
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            message = json.loads(line)
+            kind = message["type"]
+            if kind == "joined":
+                me = message["player"]
+                continue
+            if kind == "error":
+                self.stats["errors"] += 1
+                self.pending = None
+            elif kind == "start":
+                turn = message["turn"]
+            elif kind == "flip":
+                index = message["index"]
+                self.seen[index] = message["note"]
+                if message["player"] == me and self.pending is not None:
+                    self.stats["latencies"].append(time.perf_counter() - self.pending)
+                    self.stats["flips"] += 1
+                    self.pending = None
+                self.resolving = self.first is not None
+                self.first = index if self.first is None else None
+            elif kind == "match":
+                for index in message["cards"]:
+                    self.hidden.discard(index)
+                self.resolving = False
+            elif kind in ("miss", "turn"):
+                turn = message["turn"]
+                self.first = None
+                self.resolving = False
+            elif kind == "end":
+                writer.write(encode_message({"op": "leave"}))
+                return
+            if turn == me and self.pending is None and not self.resolving and self.hidden:
+                self._send_flip(writer)
+
+
+async def _run(args):
+    stats = {"flips": 0, "errors": 0, "latencies": []}
+    rooms = args.rooms
+    bots = []
+    for r in range(rooms):
+        schedule = {}
+        for _ in range(args.players):
+            bots.append(BotPlayer(args.host, args.port, f"load-{r}", args.cards,
+                                  args.time_limit, args.players, stats, schedule))
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(bot.run(deadline) for bot in bots))
+    spent = time.perf_counter() - started
+    return stats, spent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="対戦サーバーの負荷試験")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--rooms", type=int, default=TARGET_ROOMS)
+    parser.add_argument("--players", type=int, default=1, choices=(1, 2))
+    parser.add_argument("--cards", type=int, default=GameConstants.CARD_COUNT_4X4)
+    parser.add_argument("--time-limit", type=int, default=GameConstants.MAX_TIME_LIMIT)
+    parser.add_argument("--duration", type=float, default=10.0, help="試験時間（秒）")
+    args = parser.parse_args()
+
+    stats, spent = asyncio.run(_run(args))
+    rate = stats["flips"] / spent
+    latencies = np.array(stats["latencies"]) * 1000
+    p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (0.0, 0.0)
+    print(f"部屋数: {args.rooms}  めくり: {stats['flips']}  エラー: {stats['errors']}")
+    print(f"めくり/秒: {rate:.0f} (目標 {TARGET_FLIPS_PER_SECOND})")
+    print(f"遅延 p50: {p50:.2f}ms  p99: {p99:.2f}ms (目標 p99 < {TARGET_P99_LATENCY_MS}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,24 @@
+import argparse
+
 import pygame
 import numpy as np
-import sounddevice as sd
 import random
 import time
 import os
 
+import leaderboard
+import session_log
+import snapshot
+
+# numpy 2 以降は FFT の結果を既存の配列に書き込める
+_RFFT_HAS_OUT = int(np.__version__.split(".")[0]) >= 2
+
+try:
+    import sounddevice as sd
+except (ImportError, OSError):
+    # オーディオデバイスの無い環境（オフラインレンダリング等）では再生を行わない
+    sd = None
+
 
 # ======================
 # 定数定義
@@ -20,6 +34,18 @@ class GameConstants:
     CARD_GAP = 10
     CARD_OFFSET_Y = 60
     
+    # 盤面の表示範囲（スクロール・拡大縮小）
+    BOARD_RIGHT_MARGIN = 100
+    MIN_ZOOM = 0.5
+    MAX_ZOOM = 2.0
+    ZOOM_STEP = 1.25
+    SCROLL_STEP = 40
+    SCROLLBAR_WIDTH = 4
+    
+    # 高解像度の画面（この高さで 1 倍、拡大率は UI_SCALE_STEP 刻み）
+    UI_REFERENCE_HEIGHT = 1080
+    UI_SCALE_STEP = 0.25
+    
     # 色定義
     COLOR_WHITE = (255, 255, 255)
     COLOR_BLACK = (0, 0, 0)
@@ -53,9 +79,26 @@ class GameConstants:
     DEFAULT_TONE_DURATION = 1.0
     DEFAULT_TONE_AMPLITUDE = 0.5
     
+    # 描画設定
+    TARGET_FPS = 60
+    
+    # 音の表示パネル
+    VISUALIZER_HEIGHT = 80
+    VISUALIZER_MARGIN = 10
+    VISUALIZER_FFT_SIZE = 4096
+    VISUALIZER_MIN_FREQ = 200
+    VISUALIZER_MAX_FREQ = 1100
+    VISUALIZER_FLOOR_DB = -60
+    
     # ゲーム設定
     CARD_COUNT_4X4 = 16
     CARD_COUNT_6X6 = 36
+    
+    # 記録設定
+    SESSION_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions.jsonl")
+    SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resume.snap")
+    SNAPSHOT_INTERVAL = 3.0
+    LEADERBOARD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "leaderboard.db")
 
 
 # 音階の定義（周波数）
@@ -74,17 +117,69 @@ NOTE_FREQUENCIES = {
 # ======================
 # ユーティリティ関数
 # ======================
+def generate_tone(frequency=440, duration=GameConstants.DEFAULT_TONE_DURATION, 
+                  sample_rate=GameConstants.DEFAULT_SAMPLE_RATE):
+    """指定された周波数の波形を生成"""
+    t = np.linspace(0, duration, int(sample_rate * duration), False)
+    return GameConstants.DEFAULT_TONE_AMPLITUDE * np.sin(2 * np.pi * frequency * t)
+
+
 def play_tone(frequency=440, duration=GameConstants.DEFAULT_TONE_DURATION, 
               sample_rate=GameConstants.DEFAULT_SAMPLE_RATE):
     """指定された周波数の音を再生"""
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    wave = GameConstants.DEFAULT_TONE_AMPLITUDE * np.sin(2 * np.pi * frequency * t)
+    play_wave(generate_tone(frequency, duration, sample_rate), sample_rate)
+
+
+def play_wave(wave, sample_rate=GameConstants.DEFAULT_SAMPLE_RATE, blocking=True):
+    """波形を再生（blocking=False なら再生の終了を待たない）"""
+    if sd is None:
+        return
     sd.play(wave, samplerate=sample_rate)
-    sd.wait()
+    if blocking:
+        sd.wait()
+
+
+def menu_screen_size(scale=1.0):
+    """メニュー画面のサイズ"""
+    return round(GameConstants.DEFAULT_WIDTH * scale), round(GameConstants.DEFAULT_HEIGHT * scale)
+
+
+def board_screen_size(card_count, scale=1.0):
+    """盤面全体が等倍で収まる画面のサイズ（画面外での書き出し用。ウィンドウは menu_screen_size のまま）"""
+    grid_size = int(card_count ** 0.5)
+    min_width, min_height = menu_screen_size(scale)
+    width = max(min_width, 
+               round(((GameConstants.CARD_SIZE + GameConstants.CARD_GAP) * grid_size + 100) * scale))
+    height = max(min_height, 
+                round(((GameConstants.CARD_SIZE + GameConstants.CARD_GAP) * grid_size + 160) * scale))
+    return width, height
+
+
+def display_scale():
+    """モニターの高さに合わせた UI の拡大率（1 倍未満にはしない）"""
+    try:
+        height = pygame.display.get_desktop_sizes()[0][1]
+    except (AttributeError, IndexError, pygame.error):
+        return 1.0
+    step = GameConstants.UI_SCALE_STEP
+    return max(1.0, (height / GameConstants.UI_REFERENCE_HEIGHT) // step * step)
+
+
+_font_cache = {}
+
+
+def get_font(size, japanese=True):
+    """フォントを取得（同じ大きさのフォントは一度だけ読み込む）"""
+    key = (size, japanese)
+    font = _font_cache.get(key)
+    if font is None:
+        font = _load_font(size) if japanese else pygame.font.Font(None, size)
+        _font_cache[key] = font
+    return font
 
 
-def get_font(size):
-    """日本語対応フォントを取得"""
+def _load_font(size):
+    """日本語対応フォントを読み込む"""
     available_fonts = pygame.font.get_fonts()
     
     japanese_font_candidates = [
@@ -114,15 +209,18 @@ def get_font(size):
 # ======================
 class CardDeck:
     """カードデッキの管理"""
-    def __init__(self, num_cards):
+    def __init__(self, num_cards, rng=None):
         self.num_cards = num_cards
+        self.rng = rng if rng is not None else random
         self.cards = self._shuffle_deck()
         
     def _shuffle_deck(self):
         """カードをシャッフルしてペアを作成"""
-        notes = list(NOTE_FREQUENCIES.keys()) * (self.num_cards // 2)
-        random.shuffle(notes)
-        return notes
+        notes = list(NOTE_FREQUENCIES.keys())
+        pairs = [notes[i % len(notes)] for i in range(self.num_cards // 2)]
+        cards = pairs * 2
+        self.rng.shuffle(cards)
+        return cards
     
     def get_card(self, index):
         """指定インデックスのカードを取得"""
@@ -134,19 +232,22 @@ class CardDeck:
 
 class GameState:
     """ゲーム状態の管理"""
-    def __init__(self, card_count, time_limit):
+    def __init__(self, card_count, time_limit, clock=time.time, tone_player=play_tone, rng=None):
+        self.clock = clock
+        self.tone_player = tone_player
         self.card_count = card_count
         self.time_limit = time_limit
-        self.deck = CardDeck(card_count)
+        self.deck = CardDeck(card_count, rng)
         self.card_positions = self._calculate_positions()
         self.card_states = ["hidden"] * card_count
         self.card_values = [None] * card_count
         self.selected_cards = []
         self.matches_found = 0
-        self.start_time = time.time()
+        self.start_time = self.clock()
         self.game_paused = False
         self.pause_start_time = 0
         self.paused_time = 0
+        self.flip_log = []  # (経過時間, カード番号)
         
     def _calculate_positions(self):
         """カードの位置を計算"""
@@ -162,7 +263,7 @@ class GameState:
         """経過時間を計算"""
         if self.game_paused:
             return self.pause_start_time - self.start_time - self.paused_time
-        return time.time() - self.start_time - self.paused_time
+        return self.clock() - self.start_time - self.paused_time
     
     def get_time_left(self):
         """残り時間を取得"""
@@ -172,17 +273,19 @@ class GameState:
         """一時停止の切り替え"""
         if not self.game_paused:
             self.game_paused = True
-            self.pause_start_time = time.time()
+            self.pause_start_time = self.clock()
         else:
             self.game_paused = False
-            self.paused_time += time.time() - self.pause_start_time
+            self.paused_time += self.clock() - self.pause_start_time
     
     def flip_card(self, index):
         """カードをめくる"""
         if self.card_states[index] == "hidden":
             self.card_states[index] = "flipped"
             self.selected_cards.append(index)
-            play_tone(NOTE_FREQUENCIES[self.deck.get_card(index)])
+            self.flip_log.append((self.get_elapsed_time(), index))
+            if self.tone_player is not None:
+                self.tone_player(NOTE_FREQUENCIES[self.deck.get_card(index)])
     
     def check_match(self):
         """選択された2枚のカードがマッチするか確認"""
@@ -215,162 +318,363 @@ class GameState:
 # ======================
 # UI描画クラス
 # ======================
+class ScreenLayout:
+    """画面サイズと拡大率から決まる配置（解像度ごとに1回だけ計算し、描画と当たり判定で共有）"""
+    def __init__(self, size, scale=1.0):
+        self.width, self.height = size
+        self.scale = scale
+        px = self.px
+        center_x = self.width // 2
+        
+        # メニュー画面
+        self.title_y = px(100)
+        self.button_4x4 = pygame.Rect(center_x - px(150), px(200), 
+                                      px(GameConstants.BUTTON_WIDTH), px(GameConstants.BUTTON_HEIGHT))
+        self.button_6x6 = self.button_4x4.move(0, px(50))
+        self.time_label_pos = (center_x - px(150), px(300))
+        self.time_value_pos = (center_x + px(50), px(300))
+        self.time_adjust_button = pygame.Rect(center_x - px(100), px(340), 
+                                              px(200), px(GameConstants.BUTTON_HEIGHT))
+        self.start_button = pygame.Rect(center_x - px(100), px(400), 
+                                        px(200), px(GameConstants.LARGE_BUTTON_HEIGHT))
+        self.best_y = px(480)
+        
+        # 時間制限調整画面
+        self.time_text_y = px(200)
+        self.minus_button = pygame.Rect(center_x - px(150), px(250), px(50), px(50))
+        self.plus_button = pygame.Rect(center_x + px(100), px(250), px(50), px(50))
+        self.value_y = px(260)
+        self.confirm_button = pygame.Rect(center_x - px(100), px(350), 
+                                          px(200), px(GameConstants.LARGE_BUTTON_HEIGHT))
+        
+        # ゲーム画面
+        self.score_pos = (px(10), px(10))
+        self.time_left_pos = (self.width - px(250), px(10))
+        self.pause_button = pygame.Rect(self.width - px(100), px(50), px(80), px(GameConstants.BUTTON_HEIGHT))
+        self.menu_button = pygame.Rect(self.width - px(200), px(60), px(150), px(GameConstants.BUTTON_HEIGHT))
+        margin = px(GameConstants.VISUALIZER_MARGIN)
+        panel_height = px(GameConstants.VISUALIZER_HEIGHT)
+        self.visualizer = pygame.Rect(margin, self.height - panel_height - margin, 
+                                      self.width - 2 * margin, panel_height)
+        self.board = pygame.Rect(0, px(GameConstants.CARD_OFFSET_Y), 
+                                 self.width - px(GameConstants.BOARD_RIGHT_MARGIN), 
+                                 self.visualizer.y - margin - px(GameConstants.CARD_OFFSET_Y))
+    
+    def px(self, value):
+        """1倍のときのピクセル数を拡大率に合わせる"""
+        return round(value * self.scale)
+
+
+class BoardViewport:
+    """盤面のうち画面に見えている範囲（スクロールと拡大縮小）"""
+    def __init__(self, card_count, rect, scale=1.0):
+        self.grid_size = int(card_count ** 0.5)
+        self.rect = pygame.Rect(rect)  # 盤面を描く画面上の領域
+        self.scale = scale  # 画面の拡大率（zoom はこれに掛け合わせる）
+        self.zoom = 1.0
+        self.offset_x = 0  # 領域の左上に来る盤面上の座標
+        self.offset_y = 0
+        self._update_metrics()
+    
+    @classmethod
+    def for_layout(cls, card_count, layout):
+        """画面の配置に合わせて作成"""
+        return cls(card_count, layout.board, layout.scale)
+    
+    def _update_metrics(self):
+        factor = self.scale * self.zoom
+        self.card_size = max(1, round(GameConstants.CARD_SIZE * factor))
+        self.pitch = max(self.card_size + 1, 
+                         round((GameConstants.CARD_SIZE + GameConstants.CARD_GAP) * factor))
+        self.board_width = self.pitch * self.grid_size - (self.pitch - self.card_size)
+        self.board_height = self.board_width
+        self._clamp()
+    
+    def _clamp(self):
+        self.offset_x = max(0, min(self.offset_x, self.board_width - self.rect.width))
+        self.offset_y = max(0, min(self.offset_y, self.board_height - self.rect.height))
+    
+    def scroll(self, dx, dy):
+        """表示範囲を移動"""
+        self.offset_x += dx
+        self.offset_y += dy
+        self._clamp()
+    
+    def set_zoom(self, zoom, anchor=None):
+        """拡大率を変更（anchor の画面座標にある盤面上の点を動かさない）"""
+        zoom = max(GameConstants.MIN_ZOOM, min(GameConstants.MAX_ZOOM, zoom))
+        ax, ay = anchor if anchor is not None else self.rect.center
+        ax -= self.rect.x
+        ay -= self.rect.y
+        old_pitch = self.pitch
+        board_x = (ax + self.offset_x) / old_pitch
+        board_y = (ay + self.offset_y) / old_pitch
+        self.zoom = zoom
+        self._update_metrics()
+        self.offset_x = round(board_x * self.pitch - ax)
+        self.offset_y = round(board_y * self.pitch - ay)
+        self._clamp()
+    
+    def zoom_to_fit(self):
+        """盤面全体が表示範囲に収まる拡大率にする（等倍より大きくはしない）"""
+        full = (GameConstants.CARD_SIZE + GameConstants.CARD_GAP) * self.grid_size - GameConstants.CARD_GAP
+        zoom = min(1.0, min(self.rect.width, self.rect.height) / (full * self.scale))
+        self.zoom = max(GameConstants.MIN_ZOOM, zoom)
+        self.offset_x = self.offset_y = 0
+        self._update_metrics()
+        # 丸めで数ピクセルはみ出すときは少しずつ小さくする
+        while self.is_scrollable() and self.zoom > GameConstants.MIN_ZOOM:
+            self.zoom = max(GameConstants.MIN_ZOOM, self.zoom - 0.01)
+            self._update_metrics()
+    
+    def is_scrollable(self):
+        return self.board_width > self.rect.width or self.board_height > self.rect.height
+    
+    def visible_cards(self):
+        """見えているカードの (番号, 画面上の x, y) を行・列の計算だけで列挙"""
+        pitch = self.pitch
+        first_col = self.offset_x // pitch
+        first_row = self.offset_y // pitch
+        last_col = min(self.grid_size, (self.offset_x + self.rect.width - 1) // pitch + 1)
+        last_row = min(self.grid_size, (self.offset_y + self.rect.height - 1) // pitch + 1)
+        left = self.rect.x - self.offset_x
+        top = self.rect.y - self.offset_y
+        for row in range(first_row, last_row):
+            y = top + row * pitch
+            for col in range(first_col, last_col):
+                yield row * self.grid_size + col, left + col * pitch, y
+    
+    def card_at(self, pos):
+        """画面座標にあるカードの番号（カードの外なら None）"""
+        mx, my = pos
+        if not self.rect.collidepoint(mx, my):
+            return None
+        board_x = mx - self.rect.x + self.offset_x
+        board_y = my - self.rect.y + self.offset_y
+        col, inner_x = divmod(board_x, self.pitch)
+        row, inner_y = divmod(board_y, self.pitch)
+        if col >= self.grid_size or row >= self.grid_size:
+            return None
+        if inner_x >= self.card_size or inner_y >= self.card_size:
+            return None
+        return row * self.grid_size + col
+
+
 class GameRenderer:
-    """ゲーム画面の描画を担当"""
-    def __init__(self, screen):
+    """ゲーム画面の描画を担当（拡大率ごとに配置・フォント・ボタンを一度だけ用意する）"""
+    def __init__(self, screen, offscreen=False, scale=1.0):
         self.screen = screen
-        self.font_large = get_font(GameConstants.FONT_SIZE_LARGE)
-        self.font_medium = get_font(GameConstants.FONT_SIZE_MEDIUM)
-        self.font_small = get_font(GameConstants.FONT_SIZE_SMALL)
-        self.card_font = pygame.font.Font(None, 36)
+        self.offscreen = offscreen  # True: 画面に出さず screen (Surface) に描くだけ
+        self.layout = ScreenLayout(screen.get_size(), scale)
+        px = self.layout.px
+        self.font_large = get_font(px(GameConstants.FONT_SIZE_LARGE))
+        self.font_medium = get_font(px(GameConstants.FONT_SIZE_MEDIUM))
+        self.font_small = get_font(px(GameConstants.FONT_SIZE_SMALL))
+        self._card_sprites = {}  # (カードの大きさ, 音階) → Surface
+        self._viewport = None
+        self._prepare_sprites()
+    
+    def _prepare_sprites(self):
+        """文字の変わらない見出しとボタンを拡大率に合わせて描いておく"""
+        layout = self.layout
+        px = layout.px
+        white = GameConstants.COLOR_WHITE
+        black = GameConstants.COLOR_BLACK
+        self.title_menu = self.font_large.render("音階神経衰弱", True, black)
+        self.title_time = self.font_large.render("時間制限の調整", True, black)
+        self.time_label = self.font_medium.render("時間制限:", True, black)
+        self.game_over_text = self.font_large.render("ゲーム終了！おめでとう！", True, GameConstants.COLOR_RED)
+        
+        self.buttons = {}
+        for key, rect, text in (("4x4", layout.button_4x4, "4x4 (16カード)"), 
+                                ("6x6", layout.button_6x6, "6x6 (36カード)")):
+            for selected, color in ((True, GameConstants.COLOR_DARK_GREEN), 
+                                    (False, GameConstants.COLOR_LIGHT_GRAY)):
+                self.buttons[key, selected] = self._make_button(rect, color, text, 
+                                                                self.font_medium, black, (None, px(5)))
+        self.buttons["time_adjust"] = self._make_button(layout.time_adjust_button, GameConstants.COLOR_DARK_GREEN, 
+                                                        "時間を調整", self.font_medium, white, (None, px(5)))
+        self.buttons["start"] = self._make_button(layout.start_button, GameConstants.COLOR_RED, 
+                                                  "開始", self.font_medium, white, (None, px(10)))
+        self.buttons["minus"] = self._make_button(layout.minus_button, GameConstants.COLOR_DARK_RED, 
+                                                  "-", self.font_medium, white, (px(15), px(10)))
+        self.buttons["plus"] = self._make_button(layout.plus_button, GameConstants.COLOR_GREEN, 
+                                                 "+", self.font_medium, white, (px(17), px(10)))
+        self.buttons["confirm"] = self._make_button(layout.confirm_button, GameConstants.COLOR_BLUE, 
+                                                    "確定", self.font_medium, white, (None, px(15)))
+        for paused, color in ((True, GameConstants.COLOR_PAUSE_BLUE), (False, GameConstants.COLOR_RED)):
+            self.buttons["pause", paused] = self._make_button(layout.pause_button, color, 
+                                                              "停止", self.font_small, white, (px(20), 0))
+        self.buttons["menu"] = self._make_button(layout.menu_button, (50, 50, 200), 
+                                                 "メニューに戻る", self.font_small, white, (px(10), px(10)))
     
-    def draw_menu(self, card_count, time_limit):
+    def _make_button(self, rect, color, text, font, text_color, text_offset):
+        """ボタンと文字を1枚の Surface にまとめる（文字がはみ出す分も含める）
+        
+        text_offset の x が None なら文字をボタンの中央に置く
+        """
+        label = font.render(text, True, text_color)
+        dx, dy = text_offset
+        if dx is None:
+            dx = (rect.width - label.get_width()) // 2
+        label_rect = label.get_rect(topleft=(rect.x + dx, rect.y + dy))
+        bounds = rect.union(label_rect)
+        surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        surface.fill(color, rect.move(-bounds.x, -bounds.y))
+        surface.blit(label, label_rect.move(-bounds.x, -bounds.y))
+        return surface, bounds.topleft
+    
+    def _blit_button(self, key):
+        surface, pos = self.buttons[key]
+        self.screen.blit(surface, pos)
+    
+    def draw_menu(self, card_count, time_limit, best=None):
         """メニュー画面の描画"""
+        layout = self.layout
         self.screen.fill(GameConstants.COLOR_WHITE)
         
         # タイトル
-        title_text = self.font_large.render("音階神経衰弱", True, GameConstants.COLOR_BLACK)
-        self._center_blit(title_text, 100)
+        self._center_blit(self.title_menu, layout.title_y)
         
-        # 4x4ボタン
-        button_4x4_color = GameConstants.COLOR_DARK_GREEN if card_count == 16 else GameConstants.COLOR_LIGHT_GRAY
-        self._draw_button(button_4x4_color, 200, "4x4 (16カード)")
-        
-        # 6x6ボタン
-        button_6x6_color = GameConstants.COLOR_DARK_GREEN if card_count == 36 else GameConstants.COLOR_LIGHT_GRAY
-        self._draw_button(button_6x6_color, 250, "6x6 (36カード)")
+        # 4x4 / 6x6 ボタン
+        self._blit_button(("4x4", card_count == GameConstants.CARD_COUNT_4X4))
+        self._blit_button(("6x6", card_count == GameConstants.CARD_COUNT_6X6))
         
         # 時間制限表示
-        time_label = self.font_medium.render("時間制限:", True, GameConstants.COLOR_BLACK)
-        self.screen.blit(time_label, (self._center_x() - 150, 300))
+        self.screen.blit(self.time_label, layout.time_label_pos)
         time_value = self.font_medium.render(f"{time_limit}秒", True, GameConstants.COLOR_BLACK)
-        self.screen.blit(time_value, (self._center_x() + 50, 300))
+        self.screen.blit(time_value, layout.time_value_pos)
         
-        # 時間調整ボタン
-        pygame.draw.rect(self.screen, GameConstants.COLOR_DARK_GREEN, 
-                        (self._center_x() - 100, 340, 200, GameConstants.BUTTON_HEIGHT))
-        time_adjust_text = self.font_medium.render("時間を調整", True, GameConstants.COLOR_WHITE)
-        self._center_blit(time_adjust_text, 345)
+        # 時間調整ボタン・開始ボタン
+        self._blit_button("time_adjust")
+        self._blit_button("start")
         
-        # 開始ボタン
-        pygame.draw.rect(self.screen, GameConstants.COLOR_RED, 
-                        (self._center_x() - 100, 400, 200, GameConstants.LARGE_BUTTON_HEIGHT))
-        start_text = self.font_medium.render("開始", True, GameConstants.COLOR_WHITE)
-        self._center_blit(start_text, 410)
+        # 最高記録
+        if best is not None:
+            best_text = self.font_medium.render(f"ベスト: {best[0]}組 ({best[1]:.1f}秒)", 
+                                                True, GameConstants.COLOR_BLACK)
+            self._center_blit(best_text, layout.best_y)
         
-        pygame.display.flip()
+        self._present()
     
     def draw_time_adjustment(self, time_limit):
         """時間制限調整画面の描画"""
+        layout = self.layout
         self.screen.fill(GameConstants.COLOR_WHITE)
         
         # タイトル
-        title_text = self.font_large.render("時間制限の調整", True, GameConstants.COLOR_BLACK)
-        self._center_blit(title_text, 100)
+        self._center_blit(self.title_time, layout.title_y)
         
         # 現在の時間制限
         time_text = self.font_medium.render(f"現在の時間制限: {time_limit}秒", True, GameConstants.COLOR_BLACK)
-        self._center_blit(time_text, 200)
-        
-        # 減少ボタン
-        pygame.draw.rect(self.screen, GameConstants.COLOR_DARK_RED, 
-                        (self._center_x() - 150, 250, 50, 50))
-        minus_text = self.font_medium.render("-", True, GameConstants.COLOR_WHITE)
-        self.screen.blit(minus_text, (self._center_x() - 135, 260))
+        self._center_blit(time_text, layout.time_text_y)
         
-        # 現在の値
+        # 減少・増加ボタンと現在の値
+        self._blit_button("minus")
         value_text = self.font_medium.render(f"{time_limit}", True, GameConstants.COLOR_BLACK)
-        self._center_blit(value_text, 260)
-        
-        # 増加ボタン
-        pygame.draw.rect(self.screen, GameConstants.COLOR_GREEN, 
-                        (self._center_x() + 100, 250, 50, 50))
-        plus_text = self.font_medium.render("+", True, GameConstants.COLOR_WHITE)
-        self.screen.blit(plus_text, (self._center_x() + 117, 260))
+        self._center_blit(value_text, layout.value_y)
+        self._blit_button("plus")
         
         # 確定ボタン
-        pygame.draw.rect(self.screen, GameConstants.COLOR_BLUE, 
-                        (self._center_x() - 100, 350, 200, GameConstants.LARGE_BUTTON_HEIGHT))
-        confirm_text = self.font_medium.render("確定", True, GameConstants.COLOR_WHITE)
-        self._center_blit(confirm_text, 365)
+        self._blit_button("confirm")
         
-        pygame.display.flip()
+        self._present()
     
-    def draw_game(self, game_state):
+    def draw_game(self, game_state, visualizer=None, viewport=None):
         """ゲーム画面の描画"""
         self.screen.fill(GameConstants.COLOR_WHITE)
         
         # ステータス表示
         self._draw_game_status(game_state)
         
-        # カード描画
-        self._draw_cards(game_state)
+        # カード描画（見えている範囲だけ）
+        if viewport is None:
+            viewport = self._default_viewport(game_state.card_count)
+        self._draw_cards(game_state, viewport)
         
         # 一時停止ボタン
-        self._draw_pause_button(game_state.game_paused)
+        self._blit_button(("pause", game_state.game_paused))
         
         # メニュー戻るボタン（ポーズ中のみ)
         if game_state.game_paused:
-            self._draw_menu_button()
+            self._blit_button("menu")
         
-        pygame.display.flip()
+        # 音の表示パネル
+        if visualizer is not None:
+            visualizer.draw(self.screen)
+        
+        self._present()
     
     def draw_game_over(self, width, height):
         """ゲーム終了画面の描画"""
-        game_over_text = self.font_large.render("ゲーム終了！おめでとう！", True, GameConstants.COLOR_RED)
-        self.screen.blit(game_over_text, 
-                        (width // 2 - game_over_text.get_width() // 2, 
+        self.screen.blit(self.game_over_text, 
+                        (width // 2 - self.game_over_text.get_width() // 2, 
                          height // 2))
-        pygame.display.flip()
+        self._present()
     
     def _draw_game_status(self, game_state):
         """スコアと残り時間の表示"""
         score_text = self.font_medium.render(f"スコア: {game_state.matches_found}", 
                                              True, GameConstants.COLOR_BLACK)
-        self.screen.blit(score_text, (10, 10))
+        self.screen.blit(score_text, self.layout.score_pos)
         
         time_text = self.font_medium.render(f"残り時間: {game_state.get_time_left():.1f}", 
                                            True, GameConstants.COLOR_BLACK)
-        self.screen.blit(time_text, (self.screen.get_width() - 250, 10))
+        self.screen.blit(time_text, self.layout.time_left_pos)
     
-    def _draw_cards(self, game_state):
-        """カードの描画"""
-        for i, (x, y) in enumerate(game_state.card_positions):
-            if game_state.card_states[i] == "hidden":
-                pygame.draw.rect(self.screen, GameConstants.COLOR_GRAY, 
-                               (x, y, GameConstants.CARD_SIZE, GameConstants.CARD_SIZE))
+    def _default_viewport(self, card_count):
+        """画面全体を使う表示範囲（スクロールなし）"""
+        if self._viewport is None or self._viewport.grid_size != int(card_count ** 0.5):
+            self._viewport = BoardViewport.for_layout(card_count, self.layout)
+        return self._viewport
+    
+    def _card_sprite(self, size, note):
+        """カード1枚分の Surface（大きさと音階ごとに一度だけ描く、note が False なら裏面）"""
+        key = (size, note)
+        sprite = self._card_sprites.get(key)
+        if sprite is None:
+            sprite = pygame.Surface((size, size), 0, self.screen)
+            if note is False:
+                sprite.fill(GameConstants.COLOR_GRAY)
             else:
-                pygame.draw.rect(self.screen, GameConstants.COLOR_GREEN, 
-                               (x, y, GameConstants.CARD_SIZE, GameConstants.CARD_SIZE))
-                if game_state.card_values[i] is not None:
-                    note_text = self.card_font.render(game_state.card_values[i], 
-                                                     True, GameConstants.COLOR_WHITE)
-                    self.screen.blit(note_text, 
-                                   (x + GameConstants.CARD_SIZE // 4, 
-                                    y + GameConstants.CARD_SIZE // 4))
-    
-    def _draw_pause_button(self, is_paused):
-        """一時停止ボタンの描画"""
-        color = GameConstants.COLOR_PAUSE_BLUE if is_paused else GameConstants.COLOR_RED
-        width = self.screen.get_width()
-        pygame.draw.rect(self.screen, color, (width - 100, 50, 80, GameConstants.BUTTON_HEIGHT))
-        pause_text = self.font_small.render("停止", True, GameConstants.COLOR_WHITE)
-        self.screen.blit(pause_text, (width - 80, 50))
-    
-    def _draw_menu_button(self):
-        """メニュー戻るボタンの描画"""
-        width = self.screen.get_width()
-        pygame.draw.rect(self.screen, (50, 50, 200), 
-                        (width - 200, 60, 150, GameConstants.BUTTON_HEIGHT))
-        menu_text = self.font_small.render("メニューに戻る", True, GameConstants.COLOR_WHITE)
-        self.screen.blit(menu_text, (width - 190, 70))
-    
-    def _draw_button(self, color, y, text):
-        """ボタンの描画"""
-        pygame.draw.rect(self.screen, color, 
-                        (self._center_x() - 150, y, GameConstants.BUTTON_WIDTH, GameConstants.BUTTON_HEIGHT))
-        button_text = self.font_medium.render(text, True, GameConstants.COLOR_BLACK)
-        self._center_blit(button_text, y + 5)
+                sprite.fill(GameConstants.COLOR_GREEN)
+                if note is not None:
+                    font = get_font(max(1, round(36 * size / GameConstants.CARD_SIZE)), japanese=False)
+                    sprite.blit(font.render(note, True, GameConstants.COLOR_WHITE), (size // 4, size // 4))
+            self._card_sprites[key] = sprite
+        return sprite
+    
+    def _draw_cards(self, game_state, viewport):
+        """カードの描画"""
+        size = viewport.card_size
+        card_states = game_state.card_states
+        card_values = game_state.card_values
+        self.screen.set_clip(viewport.rect)
+        for i, x, y in viewport.visible_cards():
+            note = False if card_states[i] == "hidden" else card_values[i]
+            self.screen.blit(self._card_sprite(size, note), (x, y))
+        self.screen.set_clip(None)
+        
+        if viewport.is_scrollable():
+            self._draw_scrollbars(viewport)
+    
+    def _draw_scrollbars(self, viewport):
+        """表示中の位置を示すスクロールバー"""
+        rect = viewport.rect
+        bar = self.layout.px(GameConstants.SCROLLBAR_WIDTH)
+        if viewport.board_width > rect.width:
+            length = rect.width * rect.width // viewport.board_width
+            x = rect.x + viewport.offset_x * rect.width // viewport.board_width
+            pygame.draw.rect(self.screen, GameConstants.COLOR_GRAY, (x, rect.bottom - bar, length, bar))
+        if viewport.board_height > rect.height:
+            length = rect.height * rect.height // viewport.board_height
+            y = rect.y + viewport.offset_y * rect.height // viewport.board_height
+            pygame.draw.rect(self.screen, GameConstants.COLOR_GRAY, (rect.right - bar, y, bar, length))
+    
+    def _present(self):
+        """描画結果を画面に反映"""
+        if not self.offscreen:
+            pygame.display.flip()
     
     def _center_x(self):
         """画面中央のX座標を取得"""
@@ -382,18 +686,154 @@ class GameRenderer:
                         (self._center_x() - text_surface.get_width() // 2, y))
 
 
+class ToneVisualizer:
+    """めくったカードの音のスペクトログラムと波形を表示するパネル"""
+    MAX_COLUMNS_PER_UPDATE = 8
+    
+    def __init__(self, rect, sample_rate=GameConstants.DEFAULT_SAMPLE_RATE, 
+                 fft_size=GameConstants.VISUALIZER_FFT_SIZE):
+        self.rect = pygame.Rect(rect)
+        self.sample_rate = sample_rate
+        self.fft_size = fft_size
+        self.hop = sample_rate // GameConstants.TARGET_FPS  # 1列 = 1フレーム分の音
+        self.window = np.hanning(fft_size)
+        self.reference = fft_size / 4  # 振幅 1 の正弦波のピークの大きさ
+        
+        # 左 2/3 をスペクトログラム、右 1/3 を波形にする
+        margin = GameConstants.VISUALIZER_MARGIN
+        spec_width = self.rect.width * 2 // 3
+        self.spec_rect = pygame.Rect(self.rect.x, self.rect.y, spec_width, self.rect.height)
+        self.wave_rect = pygame.Rect(self.rect.x + spec_width + margin, self.rect.y, 
+                                     self.rect.width - spec_width - margin, self.rect.height)
+        
+        # スペクトログラムは Surface 自体を循環バッファとして列ごとに書き換える
+        self.spectrogram = pygame.Surface(self.spec_rect.size)
+        self.spectrogram.fill(GameConstants.COLOR_BLACK)
+        self.column = 0
+        
+        # 各行に対応する FFT のビン（上ほど高い音、対数目盛り）
+        freqs = np.geomspace(GameConstants.VISUALIZER_MAX_FREQ, GameConstants.VISUALIZER_MIN_FREQ, 
+                             self.spec_rect.height)
+        self.row_bins = np.round(freqs * fft_size / sample_rate).astype(np.intp)
+        
+        # 強さ (0〜255) から色への対応表
+        level = np.linspace(0, 1, 256)
+        self.colormap = (np.stack([level ** 0.5, level ** 2, 0.6 * np.sin(np.pi * level)], axis=1) 
+                         * 255).astype(np.uint8)
+        
+        # 解析用バッファ: 先頭に前回の残り (fft_size - hop)、続けて新しい音
+        self.tail_size = fft_size - self.hop
+        self.analysis = np.zeros(self.tail_size + self.hop * self.MAX_COLUMNS_PER_UPDATE)
+        
+        # 解析の途中結果を書き込むバッファ（毎フレーム確保しない）
+        max_columns = self.MAX_COLUMNS_PER_UPDATE
+        rows = self.spec_rect.height
+        self.windowed = np.empty((max_columns, fft_size))
+        self.spectrum = np.empty((max_columns, fft_size // 2 + 1), dtype=np.complex128)
+        self.magnitude = np.empty((max_columns, fft_size // 2 + 1))
+        self.row_magnitude = np.empty((max_columns, rows))
+        self.levels = np.empty((max_columns, rows), dtype=np.uint8)
+        self.colors = np.empty((max_columns, rows, 3), dtype=np.uint8)
+        
+        # 再生中の音（新しい音が来たら置き換える: sounddevice と同じ動き）
+        self.playing = np.zeros(0)
+        self.play_pos = 0
+        self.carry = 0.0
+        
+        # 波形表示用の座標（x は固定、y だけ毎回書き換える）
+        self.wave_span = sample_rate // 100  # 10ms 分
+        point_count = max(2, self.wave_rect.width // 2)
+        self.wave_step = max(1, self.wave_span // point_count)
+        point_count = len(range(0, self.wave_span, self.wave_step))
+        self.wave_points = np.empty((point_count, 2))
+        self.wave_points[:, 0] = np.linspace(self.wave_rect.left, self.wave_rect.right - 1, point_count)
+        self.wave_points[:, 1] = self.wave_rect.centery
+    
+    def feed(self, wave):
+        """再生を始めた音を渡す"""
+        self.playing = wave
+        self.play_pos = 0
+    
+    def update(self, dt):
+        """経過時間 dt 秒分の音を解析して新しい列を書き込む"""
+        samples = dt * self.sample_rate + self.carry
+        columns = int(samples // self.hop)
+        self.carry = samples - columns * self.hop
+        columns = min(columns, self.MAX_COLUMNS_PER_UPDATE)
+        if columns == 0:
+            return
+        
+        # 新しい音をバッファの後ろに詰める（再生が終わっていれば無音）
+        count = columns * self.hop
+        end = self.tail_size + count
+        new = self.analysis[self.tail_size:end]
+        chunk = self.playing[self.play_pos:self.play_pos + count]
+        new[:len(chunk)] = chunk
+        new[len(chunk):] = 0
+        self.play_pos += len(chunk)
+        
+        # 新しい hop ごとの窓だけをまとめて FFT（途中結果は用意したバッファに書く）
+        frames = np.lib.stride_tricks.sliding_window_view(self.analysis[:end], self.fft_size)[::self.hop]
+        windowed = np.multiply(frames, self.window, out=self.windowed[:columns])
+        if _RFFT_HAS_OUT:
+            spectrum = np.fft.rfft(windowed, axis=1, out=self.spectrum[:columns])
+        else:
+            spectrum = np.fft.rfft(windowed, axis=1)  # 古い numpy では結果の配列だけ確保される
+        magnitude = np.abs(spectrum, out=self.magnitude[:columns])
+        db = np.take(magnitude, self.row_bins, axis=1, out=self.row_magnitude[:columns])
+        db *= 1 / self.reference
+        db += 1e-9
+        np.log10(db, out=db)
+        floor = GameConstants.VISUALIZER_FLOOR_DB
+        db *= 20 * 255 / -floor
+        db -= floor * 255 / -floor
+        np.clip(db, 0, 255, out=db)
+        levels = self.levels[:columns]
+        np.copyto(levels, db, casting="unsafe")
+        colors = np.take(self.colormap, levels, axis=0, out=self.colors[:columns])
+        
+        # 循環バッファの末尾で折り返す分は2回に分けて書く
+        width = self.spec_rect.width
+        first = min(columns, width - self.column)
+        pixels = pygame.surfarray.pixels3d(self.spectrogram)
+        pixels[self.column:self.column + first] = colors[:first]
+        pixels[:columns - first] = colors[first:]
+        del pixels  # Surface のロックを解除
+        self.column = (self.column + columns) % width
+        
+        # 最新 10ms の波形
+        recent = self.analysis[end - self.wave_span:end:self.wave_step]
+        scale = self.wave_rect.height / (2 * GameConstants.DEFAULT_TONE_AMPLITUDE) * 0.9
+        np.multiply(recent, -scale, out=self.wave_points[:, 1])
+        self.wave_points[:, 1] += self.wave_rect.centery
+        
+        # 次回のために末尾を先頭へ移す
+        self.analysis[:self.tail_size] = self.analysis[count:end]
+    
+    def draw(self, screen):
+        """パネルを描画（古い列が左に来るよう2回に分けて転送）"""
+        width = self.spec_rect.width
+        height = self.spec_rect.height
+        screen.blit(self.spectrogram, self.spec_rect.topleft, 
+                    pygame.Rect(self.column, 0, width - self.column, height))
+        screen.blit(self.spectrogram, (self.spec_rect.x + width - self.column, self.spec_rect.y), 
+                    pygame.Rect(0, 0, self.column, height))
+        pygame.draw.rect(screen, GameConstants.COLOR_BLACK, self.wave_rect)
+        pygame.draw.lines(screen, GameConstants.COLOR_GREEN, False, self.wave_points)
+
+
 # ======================
 # ゲームマネージャー
 # ======================
 class GameManager:
     """ゲーム全体の管理"""
-    def __init__(self):
+    def __init__(self, scale=None):
         pygame.init()
-        self.screen = pygame.display.set_mode((GameConstants.DEFAULT_WIDTH, 
-                                               GameConstants.DEFAULT_HEIGHT))
+        self.scale = scale if scale is not None else display_scale()
+        self.screen = pygame.display.set_mode(menu_screen_size(self.scale))
         pygame.display.set_caption("音階神経衰弱")
         
-        self.renderer = GameRenderer(self.screen)
+        self.renderer = GameRenderer(self.screen, scale=self.scale)
         self.card_count = GameConstants.CARD_COUNT_4X4
         self.time_limit = GameConstants.DEFAULT_TIME_LIMIT
         self.game_state = None
@@ -402,10 +842,22 @@ class GameManager:
         self.running = True
         self.waiting_for_flip = False
         self.flip_wait_time = 0
+        self.tone_end_time = 0  # 鳴っている音が終わる時刻（それまで次のカードはめくれない）
+        
+        self.frame_clock = pygame.time.Clock()
+        self.frame_time = 0
+        self.visualizer = None
+        self.viewport = None
+        
+        self.leaderboard = leaderboard.Leaderboard(GameConstants.LEADERBOARD_PATH)
+        self.snapshot_writer = snapshot.SnapshotWriter(GameConstants.SNAPSHOT_PATH)
+        self.last_snapshot_time = 0
+        self._resume_game()
     
     def run(self):
         """メインゲームループ"""
         while self.running:
+            self.frame_time = self.frame_clock.tick(GameConstants.TARGET_FPS) / 1000
             if self.current_scene == "menu":
                 self._handle_menu()
             elif self.current_scene == "time_adjustment":
@@ -415,24 +867,24 @@ class GameManager:
     
     def _handle_menu(self):
         """メニュー画面の処理"""
-        self.renderer.draw_menu(self.card_count, self.time_limit)
+        self.renderer.draw_menu(self.card_count, self.time_limit, 
+                                self.leaderboard.best(self.card_count, self.time_limit))
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                mx, my = pygame.mouse.get_pos()
-                center_x = self.screen.get_width() // 2
+                pos = pygame.mouse.get_pos()
+                layout = self.renderer.layout
                 
-                if center_x - 150 < mx < center_x + 150:
-                    if 200 < my < 240:
-                        self.card_count = GameConstants.CARD_COUNT_4X4
-                    elif 250 < my < 290:
-                        self.card_count = GameConstants.CARD_COUNT_6X6
-                    elif 340 < my < 380:
-                        self.current_scene = "time_adjustment"
-                    elif 400 < my < 450:
-                        self._start_game()
+                if layout.button_4x4.collidepoint(pos):
+                    self.card_count = GameConstants.CARD_COUNT_4X4
+                elif layout.button_6x6.collidepoint(pos):
+                    self.card_count = GameConstants.CARD_COUNT_6X6
+                elif layout.time_adjust_button.collidepoint(pos):
+                    self.current_scene = "time_adjustment"
+                elif layout.start_button.collidepoint(pos):
+                    self._start_game()
     
     def _handle_time_adjustment(self):
         """時間調整画面の処理"""
@@ -442,17 +894,16 @@ class GameManager:
             if event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                mx, my = pygame.mouse.get_pos()
-                center_x = self.screen.get_width() // 2
+                pos = pygame.mouse.get_pos()
+                layout = self.renderer.layout
                 
-                if 250 < my < 300:
-                    if center_x - 150 < mx < center_x - 100:
-                        self.time_limit = max(GameConstants.MIN_TIME_LIMIT, 
-                                            self.time_limit - GameConstants.TIME_ADJUST_STEP)
-                    elif center_x + 100 < mx < center_x + 150:
-                        self.time_limit = min(GameConstants.MAX_TIME_LIMIT, 
-                                            self.time_limit + GameConstants.TIME_ADJUST_STEP)
-                elif 350 < my < 400 and center_x - 100 < mx < center_x + 100:
+                if layout.minus_button.collidepoint(pos):
+                    self.time_limit = max(GameConstants.MIN_TIME_LIMIT, 
+                                        self.time_limit - GameConstants.TIME_ADJUST_STEP)
+                elif layout.plus_button.collidepoint(pos):
+                    self.time_limit = min(GameConstants.MAX_TIME_LIMIT, 
+                                        self.time_limit + GameConstants.TIME_ADJUST_STEP)
+                elif layout.confirm_button.collidepoint(pos):
                     self.current_scene = "menu"
     
     def _handle_game(self):
@@ -468,77 +919,150 @@ class GameManager:
             self._end_game()
             return
         
-        # ゲームクリアチェック
-        if self.game_state.is_game_complete():
+        # ゲームクリアチェック（最後の音が鳴り終わってから）
+        if self.game_state.is_game_complete() and time.time() >= self.tone_end_time:
             self._end_game()
             return
         
+        # 定期的に状態を保存
+        if time.time() - self.last_snapshot_time > GameConstants.SNAPSHOT_INTERVAL:
+            self.snapshot_writer.save(self.game_state)
+            self.last_snapshot_time = time.time()
+        
         # 描画
-        self.renderer.draw_game(self.game_state)
+        self.visualizer.update(self.frame_time)
+        self.renderer.draw_game(self.game_state, self.visualizer, self.viewport)
         
         # イベント処理
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
-            elif event.type == pygame.MOUSEBUTTONDOWN and not self.waiting_for_flip:
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 2, 3) and not self.waiting_for_flip:
                 self._handle_game_click(pygame.mouse.get_pos())
+            elif event.type == pygame.MOUSEWHEEL:
+                self._handle_board_wheel(event)
+            elif event.type == pygame.KEYDOWN:
+                self._handle_board_key(event.key)
+    
+    def _handle_board_wheel(self, event):
+        """ホイールでスクロール（Ctrl を押しながらで拡大縮小）"""
+        if pygame.key.get_mods() & pygame.KMOD_CTRL:
+            factor = GameConstants.ZOOM_STEP ** event.y
+            self.viewport.set_zoom(self.viewport.zoom * factor, pygame.mouse.get_pos())
+        else:
+            step = self.renderer.layout.px(GameConstants.SCROLL_STEP)
+            self.viewport.scroll(-event.x * step, -event.y * step)
+    
+    def _handle_board_key(self, key):
+        """矢印キーでスクロール、+ / - で拡大縮小、0 で盤面全体を表示"""
+        step = self.renderer.layout.px(GameConstants.SCROLL_STEP)
+        moves = {pygame.K_LEFT: (-step, 0), pygame.K_RIGHT: (step, 0), 
+                 pygame.K_UP: (0, -step), pygame.K_DOWN: (0, step)}
+        if key in moves:
+            self.viewport.scroll(*moves[key])
+        elif key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+            self.viewport.set_zoom(self.viewport.zoom * GameConstants.ZOOM_STEP)
+        elif key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+            self.viewport.set_zoom(self.viewport.zoom / GameConstants.ZOOM_STEP)
+        elif key in (pygame.K_0, pygame.K_KP0):
+            self.viewport.zoom_to_fit()
     
     def _handle_game_click(self, pos):
         """ゲーム中のクリック処理"""
-        mx, my = pos
-        width = self.screen.get_width()
+        layout = self.renderer.layout
         
-        # 一時停止ボタン
-        if width - 100 < mx < width - 50 and 10 < my < 50:
-            self.game_state.toggle_pause()
+        # メニュー戻るボタン（ポーズ中のみ、一時停止ボタンの上に描かれる）
+        if self.game_state.game_paused and layout.menu_button.collidepoint(pos):
+            self.current_scene = "menu"
+            self.snapshot_writer.discard()
             return
         
-        # メニュー戻るボタン（ポーズ中のみ）
-        if self.game_state.game_paused and width - 200 < mx < width - 50 and 60 < my < 100:
-            self.current_scene = "menu"
+        # 一時停止ボタン
+        if layout.pause_button.collidepoint(pos):
+            self.game_state.toggle_pause()
             return
         
-        # カードクリック
-        if not self.game_state.game_paused:
-            for i, (x, y) in enumerate(self.game_state.card_positions):
-                if x < mx < x + GameConstants.CARD_SIZE and y < my < y + GameConstants.CARD_SIZE:
-                    self.game_state.flip_card(i)
-                    
-                    # 2枚選択されたらマッチチェック
-                    if len(self.game_state.selected_cards) == 2:
-                        match_result = self.game_state.check_match()
-                        if match_result is False:
-                            self.waiting_for_flip = True
-                            self.flip_wait_time = time.time()
-                    break
+        # カードクリック（表示範囲から行・列を計算、音が鳴り終わるまではめくれない）
+        if not self.game_state.game_paused and time.time() >= self.tone_end_time:
+            index = self.viewport.card_at(pos)
+            if index is not None:
+                self.game_state.flip_card(index)
+                
+                # 2枚選択されたらマッチチェック
+                if len(self.game_state.selected_cards) == 2:
+                    match_result = self.game_state.check_match()
+                    if match_result is False:
+                        # 音が鳴り終わってから裏返すまでの待ち時間を数える
+                        self.waiting_for_flip = True
+                        self.flip_wait_time = self.tone_end_time
     
     def _start_game(self):
         """ゲームを開始"""
-        self.game_state = GameState(self.card_count, self.time_limit)
-        self._adjust_screen_size()
+        self.game_state = GameState(self.card_count, self.time_limit, tone_player=self._play_card_tone)
+        self._prepare_board()
         self.current_scene = "game"
+        self.last_snapshot_time = 0
     
-    def _adjust_screen_size(self):
-        """カード数に応じて画面サイズを調整"""
-        grid_size = int(self.card_count ** 0.5)
-        width = max(GameConstants.DEFAULT_WIDTH, 
-                   (GameConstants.CARD_SIZE + GameConstants.CARD_GAP) * grid_size + 100)
-        height = max(GameConstants.DEFAULT_HEIGHT, 
-                    (GameConstants.CARD_SIZE + GameConstants.CARD_GAP) * grid_size + 160)
-        self.screen = pygame.display.set_mode((width, height))
-        self.renderer = GameRenderer(self.screen)
+    def _resume_game(self):
+        """保存されたスナップショットがあれば一時停止状態で再開"""
+        if not os.path.exists(GameConstants.SNAPSHOT_PATH):
+            return
+        try:
+            snap = snapshot.load(GameConstants.SNAPSHOT_PATH)
+            if any(name not in NOTE_FREQUENCIES for name in snap.note_names):
+                raise ValueError("知らない音階が含まれています")
+            game_state = GameState(snap.card_count, snap.time_limit, tone_player=self._play_card_tone)
+            snapshot.apply_snapshot(game_state, snap)
+        except (OSError, ValueError, KeyError, IndexError):
+            # 壊れたファイルは消して、次回からは普通に起動する
+            self.snapshot_writer.discard()
+            return
+        if not game_state.game_paused:
+            game_state.toggle_pause()
+        # 不一致の2枚を裏返す前に保存された場合は裏返しておく
+        if len(game_state.selected_cards) == 2:
+            game_state.reset_unmatched_cards()
+        self.card_count = game_state.card_count
+        self.time_limit = game_state.time_limit
+        self.game_state = game_state
+        self._prepare_board()
+        self.current_scene = "game"
+        self.last_snapshot_time = time.time()
+    
+    def _prepare_board(self):
+        """盤面の表示範囲を用意（ウィンドウの大きさは変えず、盤面全体が見える拡大率で始める）"""
+        self.viewport = BoardViewport.for_layout(self.card_count, self.renderer.layout)
+        self.viewport.zoom_to_fit()
+        self.visualizer = ToneVisualizer(self.renderer.layout.visualizer)
+    
+    def _play_card_tone(self, frequency):
+        """カードの音を鳴らし、同じ波形を表示パネルに渡す（ゲームループは止めない）
+        
+        めくる間隔は音の長さのまま（solver.py・simulate.py の前提と同じ）
+        """
+        wave = generate_tone(frequency)
+        self.visualizer.feed(wave)
+        play_wave(wave, blocking=False)
+        self.tone_end_time = time.time() + GameConstants.DEFAULT_TONE_DURATION
     
     def _end_game(self):
         """ゲーム終了処理"""
+        session_log.append_session(GameConstants.SESSION_LOG_PATH, 
+                                   session_log.session_to_record(self.game_state))
+        self.snapshot_writer.discard()
+        self.leaderboard.submit(self.game_state.card_count, self.game_state.time_limit, 
+                                self.game_state.matches_found, 
+                                min(self.game_state.get_elapsed_time(), self.game_state.time_limit))
         self.renderer.draw_game_over(self.screen.get_width(), self.screen.get_height())
         pygame.time.wait(2000)
         self.current_scene = "menu"
-        self.screen = pygame.display.set_mode((GameConstants.DEFAULT_WIDTH, 
-                                               GameConstants.DEFAULT_HEIGHT))
-        self.renderer = GameRenderer(self.screen)
     
     def quit(self):
         """ゲームを終了"""
+        if self.current_scene == "game":
+            self.snapshot_writer.save(self.game_state)
+        self.snapshot_writer.close()
+        self.leaderboard.close()
         pygame.quit()
 
 
@@ -546,7 +1070,12 @@ class GameManager:
 # メイン実行
 # ======================
 def main():
-    game = GameManager()
+    parser = argparse.ArgumentParser(description="音階神経衰弱")
+    parser.add_argument("--scale", type=float, 
+                        help="画面の拡大率（省略時はモニターの解像度から決める）")
+    args = parser.parse_args()
+    
+    game = GameManager(args.scale)
     game.run()
     game.quit()
 
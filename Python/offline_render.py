@@ -0,0 +1,102 @@
+import argparse
+import time
+import wave
+
+import numpy as np
+
+from main import GameConstants, NOTE_FREQUENCIES, generate_tone
+import session_log
+
+
+# ======================
+# オフライン音声レンダリング
+# ======================
+class SessionAudioRenderer:
+    """記録されたゲームの音を WAV ファイルに書き出す"""
+    def __init__(self, sample_rate=GameConstants.DEFAULT_SAMPLE_RATE,
+                 tone_duration=GameConstants.DEFAULT_TONE_DURATION,
+                 chunk_seconds=10.0):
+        self.sample_rate = sample_rate
+        self.chunk_size = int(sample_rate * chunk_seconds)
+        # 音階ごとの波形を一度だけ生成しておく (音階数 x サンプル数)
+        self.note_names = list(NOTE_FREQUENCIES.keys())
+        self.note_index = {name: i for i, name in enumerate(self.note_names)}
+        self.tone_bank = np.stack([
+            generate_tone(NOTE_FREQUENCIES[name], tone_duration, sample_rate)
+            for name in self.note_names
+        ])
+        self.tone_length = self.tone_bank.shape[1]
+
+    def _events(self, record):
+        """めくり記録を (開始サンプル, 音階番号) の配列に変換"""
+        flips = sorted(record["flips"])
+        starts = np.array([round(t * self.sample_rate) for t, _ in flips], dtype=np.int64)
+        notes = np.array([self.note_index[record["deck"][i]] for _, i in flips], dtype=np.int64)
+        return starts, notes
+
+    def _total_samples(self, record, starts):
+        """出力全体のサンプル数"""
+        end = round(record.get("elapsed", 0) * self.sample_rate)
+        if len(starts):
+            end = max(end, int(starts[-1]) + self.tone_length)
+        return end
+
+    def _mix_chunk(self, starts, notes, chunk_start, chunk_length):
+        """区間 [chunk_start, chunk_start + chunk_length) に鳴る音をまとめて合成"""
+        # 区間に重なる音だけを二分探索で取り出す
+        lo = np.searchsorted(starts, chunk_start - self.tone_length, side="right")
+        hi = np.searchsorted(starts, chunk_start + chunk_length, side="left")
+        if lo >= hi:
+            return np.zeros(chunk_length)
+        offsets = np.arange(self.tone_length)
+        positions = starts[lo:hi, None] - chunk_start + offsets[None, :]
+        mask = (positions >= 0) & (positions < chunk_length)
+        samples = self.tone_bank[notes[lo:hi]]
+        return np.bincount(positions[mask], weights=samples[mask], minlength=chunk_length)
+
+    def render(self, record, path):
+        """記録を WAV ファイルに書き出し、出力サンプル数を返す"""
+        starts, notes = self._events(record)
+        total = self._total_samples(record, starts)
+        with wave.open(path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            for chunk_start in range(0, total, self.chunk_size):
+                chunk_length = min(self.chunk_size, total - chunk_start)
+                mixed = self._mix_chunk(starts, notes, chunk_start, chunk_length)
+                pcm = (np.clip(mixed, -1.0, 1.0) * 32767).astype("<i2")
+                wav.writeframes(pcm.tobytes())
+        return total
+
+
+# ======================
+# コマンドライン
+# ======================
+def main():
+    parser = argparse.ArgumentParser(description="ゲームの音を WAV ファイルに書き出す")
+    parser.add_argument("output", help="出力する WAV ファイル")
+    parser.add_argument("--log", default=GameConstants.SESSION_LOG_PATH, help="セッション記録ファイル")
+    parser.add_argument("--index", type=int, default=-1, help="記録中の何番目のゲームか")
+    parser.add_argument("--simulate", type=int, metavar="CARDS", help="記録の代わりに模擬ゲームを使う")
+    parser.add_argument("--time-limit", type=int, default=GameConstants.DEFAULT_TIME_LIMIT)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    if args.simulate:
+        from simulate import simulate_session
+        record = simulate_session(args.simulate, args.time_limit, seed=args.seed)
+    else:
+        record = list(session_log.iter_sessions(args.log))[args.index]
+
+    renderer = SessionAudioRenderer()
+    started = time.perf_counter()
+    samples = renderer.render(record, args.output)
+    spent = time.perf_counter() - started
+    duration = samples / renderer.sample_rate
+    print(f"{duration:.1f}秒の音声を {spent:.3f}秒で書き出しました "
+          f"(実時間の {duration / max(spent, 1e-9):.0f} 倍)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import json
+
+
+# ======================
+# セッション記録
+# ======================
+# 1行に1ゲームを JSON で保存する (JSON Lines 形式)
+#   card_count, time_limit: 盤面設定
+#   deck: カードの並び (音階名)
+#   flips: [経過時間, カード番号] のリスト
+#   matches_found, elapsed: 終了時のスコアと経過時間
+
+def session_to_record(game_state):
+    """ゲーム状態を記録用の辞書に変換"""
+    return {
+        "card_count": game_state.card_count,
+        "time_limit": game_state.time_limit,
+        "deck": list(game_state.deck.cards),
+        "flips": [[round(t, 4), index] for t, index in game_state.flip_log],
+        "matches_found": game_state.matches_found,
+        "elapsed": round(min(game_state.get_elapsed_time(), game_state.time_limit), 4),
+    }
+
+
+def append_session(path, record):
+    """記録をファイル末尾に追記"""
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def iter_sessions(path):
+    """記録ファイルから1ゲームずつ読み出す"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
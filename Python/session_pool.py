@@ -0,0 +1,338 @@
+import argparse
+import sys
+import time
+import types
+
+import numpy as np
+
+from main import GameConstants, NOTE_FREQUENCIES
+
+
+# ======================
+# セッションプール
+# ======================
+# 全ゲームの状態を項目ごとに1本の配列へまとめて持つ (struct-of-arrays)
+# カードの状態: 0 = 裏 (hidden), 1 = めくり中 (flipped), 2 = そろった
+CARD_HIDDEN = 0
+CARD_FLIPPED = 1
+CARD_MATCHED = 2
+CARD_STATE_NAMES = ("hidden", "flipped", "flipped")
+
+NOTE_NAMES = list(NOTE_FREQUENCIES.keys())
+NO_CARD = -1
+NOT_LIVE = -2
+
+
+class PoolExhausted(Exception):
+    """プールに空きが無い"""
+
+
+MAX_POOL_CARDS = 32767  # selected を int16 で持てる上限
+
+
+class SessionPool:
+    """多数のゲームを少ないメモリで保持するプール
+
+    record_flips=True のときはゲームごとにめくり記録 (flip_log) も持つ。
+    記録はゲームごとに長さが変わるので配列ではなくリストで持ち、
+    snapshot.encode / session_log.session_to_record にビューをそのまま渡せる。
+    False のときの flip_log は常に空になる。
+    """
+    def __init__(self, capacity, max_cards=GameConstants.CARD_COUNT_4X4, clock=time.time, seed=None,
+                 record_flips=False):
+        if capacity < 0:
+            raise ValueError("capacity は 0 以上にしてください")
+        if not 0 < max_cards <= MAX_POOL_CARDS:
+            raise ValueError(f"max_cards は 1〜{MAX_POOL_CARDS} にしてください")
+        self.capacity = capacity
+        self.max_cards = max_cards
+        self.clock = clock
+        self.tone_player = None
+        self.rng = np.random.default_rng(seed)
+        self.flip_logs = {} if record_flips else None
+
+        # カード番号・枚数は max_cards が収まる一番小さい型にする
+        index_dtype = np.int8 if max_cards <= np.iinfo(np.int8).max else np.int16
+        count_dtype = np.uint8 if max_cards <= np.iinfo(np.uint8).max else np.uint16
+        self.deck = np.zeros((capacity, max_cards), dtype=np.uint8)         # 音階番号
+        self.card_state = np.zeros((capacity, max_cards), dtype=np.uint8)
+        self.selected = np.full((capacity, 2), NO_CARD, dtype=index_dtype)
+        self.matches = np.zeros(capacity, dtype=count_dtype)
+        self.card_count = np.zeros(capacity, dtype=count_dtype)
+        self.time_limit = np.zeros(capacity, dtype=np.uint16)
+        self.paused = np.zeros(capacity, dtype=np.bool_)
+        self.start_time = np.zeros(capacity, dtype=np.float64)
+        self.pause_start = np.zeros(capacity, dtype=np.float64)
+        self.paused_time = np.zeros(capacity, dtype=np.float32)
+
+        # 空きリスト: next_free[i] は次の空き番号、使用中は NOT_LIVE
+        self.next_free = np.arange(1, capacity + 1, dtype=np.int32)
+        if capacity:
+            self.next_free[-1] = NO_CARD
+        self.free_head = 0 if capacity else NO_CARD
+        self.live_count = 0
+
+        # 盤面サイズごとのペア配列 (シャッフル前)
+        self._base_decks = {}
+
+    def _base_deck(self, card_count):
+        base = self._base_decks.get(card_count)
+        if base is None:
+            pairs = np.arange(card_count // 2, dtype=np.uint8) % len(NOTE_NAMES)
+            base = np.concatenate([pairs, pairs])
+            self._base_decks[card_count] = base
+        return base
+
+    def allocate(self, card_count, time_limit):
+        """新しいゲームを割り当てて番号を返す (O(1))"""
+        if card_count > self.max_cards:
+            raise ValueError(f"card_count は {self.max_cards} 以下にしてください")
+        sid = self.free_head
+        if sid == NO_CARD:
+            raise PoolExhausted("セッションプールが満杯です")
+        self.free_head = int(self.next_free[sid])
+        self.next_free[sid] = NOT_LIVE
+        self.live_count += 1
+
+        self.deck[sid, :card_count] = self.rng.permutation(self._base_deck(card_count))
+        self.card_state[sid] = CARD_HIDDEN
+        self.selected[sid] = NO_CARD
+        self.matches[sid] = 0
+        self.card_count[sid] = card_count
+        self.time_limit[sid] = time_limit
+        self.paused[sid] = False
+        self.start_time[sid] = self.clock()
+        self.pause_start[sid] = 0
+        self.paused_time[sid] = 0
+        if self.flip_logs is not None:
+            self.flip_logs[sid] = []
+        return sid
+
+    def free(self, sid):
+        """ゲームを解放して番号を空きリストに戻す (O(1))"""
+        if not self.is_live(sid):
+            raise KeyError(sid)
+        self.next_free[sid] = self.free_head
+        self.free_head = sid
+        self.live_count -= 1
+        if self.flip_logs is not None:
+            self.flip_logs.pop(sid, None)
+
+    def is_live(self, sid):
+        return 0 <= sid < self.capacity and self.next_free[sid] == NOT_LIVE
+
+    def view(self, sid):
+        """GameState と同じ使い方ができるビューを返す"""
+        if not self.is_live(sid):
+            raise KeyError(sid)
+        return SessionView(self, sid)
+
+    def _arrays(self):
+        return (self.deck, self.card_state, self.selected, self.matches, self.card_count,
+                self.time_limit, self.paused, self.start_time, self.pause_start,
+                self.paused_time, self.next_free)
+
+    def nbytes(self):
+        """プール全体の配列のバイト数"""
+        return sum(a.nbytes for a in self._arrays())
+
+    def bytes_per_session(self):
+        """1ゲームあたりのバイト数"""
+        return self.nbytes() / max(self.capacity, 1)
+
+
+# ======================
+# GameState 互換ビュー
+# ======================
+class _DeckView:
+    """CardDeck 互換の読み取り専用ビュー"""
+    __slots__ = ("pool", "sid")
+
+    def __init__(self, pool, sid):
+        self.pool = pool
+        self.sid = sid
+
+    @property
+    def cards(self):
+        row = self.pool.deck[self.sid, :len(self)]
+        return [NOTE_NAMES[n] for n in row]
+
+    def get_card(self, index):
+        return NOTE_NAMES[self.pool.deck[self.sid, index]]
+
+    def __len__(self):
+        return int(self.pool.card_count[self.sid])
+
+
+class SessionView:
+    """プール内の1ゲームを GameState と同じ API で操作するビュー
+
+    属性は読み取り専用（状態の変更はメソッド経由）。snapshot.apply_snapshot の
+    書き戻し先には使えないので、復元は GameState に対して行う。
+    """
+    __slots__ = ("pool", "sid", "deck")
+
+    def __init__(self, pool, sid):
+        self.pool = pool
+        self.sid = sid
+        self.deck = _DeckView(pool, sid)
+
+    # --- 読み取り用プロパティ ---
+    @property
+    def card_count(self):
+        return int(self.pool.card_count[self.sid])
+
+    @property
+    def time_limit(self):
+        return int(self.pool.time_limit[self.sid])
+
+    @property
+    def matches_found(self):
+        return int(self.pool.matches[self.sid])
+
+    @property
+    def game_paused(self):
+        return bool(self.pool.paused[self.sid])
+
+    @property
+    def card_states(self):
+        row = self.pool.card_state[self.sid, :self.card_count]
+        return [CARD_STATE_NAMES[s] for s in row]
+
+    @property
+    def card_values(self):
+        row = self.pool.card_state[self.sid, :self.card_count]
+        return [self.deck.get_card(i) if s == CARD_MATCHED else None for i, s in enumerate(row)]
+
+    @property
+    def selected_cards(self):
+        return [int(i) for i in self.pool.selected[self.sid] if i != NO_CARD]
+
+    @property
+    def flip_log(self):
+        """(経過時間, カード番号) のリスト（record_flips=False のプールでは空）"""
+        if self.pool.flip_logs is None:
+            return []
+        return self.pool.flip_logs[self.sid]
+
+    @property
+    def card_positions(self):
+        """GameState と同じ並びのカードの位置"""
+        grid_size = int(self.card_count ** 0.5)
+        pitch = GameConstants.CARD_SIZE + GameConstants.CARD_GAP
+        return [(x * pitch, y * pitch + GameConstants.CARD_OFFSET_Y)
+                for y in range(grid_size) for x in range(grid_size)]
+
+    # --- GameState と同じ操作 ---
+    def get_elapsed_time(self):
+        """経過時間を計算"""
+        pool, sid = self.pool, self.sid
+        now = pool.pause_start[sid] if pool.paused[sid] else pool.clock()
+        return now - pool.start_time[sid] - pool.paused_time[sid]
+
+    def get_time_left(self):
+        """残り時間を取得"""
+        return max(0, self.time_limit - self.get_elapsed_time())
+
+    def toggle_pause(self):
+        """一時停止の切り替え"""
+        pool, sid = self.pool, self.sid
+        if not pool.paused[sid]:
+            pool.paused[sid] = True
+            pool.pause_start[sid] = pool.clock()
+        else:
+            pool.paused[sid] = False
+            pool.paused_time[sid] += pool.clock() - pool.pause_start[sid]
+
+    def flip_card(self, index):
+        """カードをめくる（番号が 0〜card_count-1 の外なら IndexError）"""
+        pool, sid = self.pool, self.sid
+        # 行は max_cards 列あるので、範囲外や負の番号が別のセッションの領域や末尾に届かないようにする
+        if not 0 <= index < pool.card_count[sid]:
+            raise IndexError(f"カード番号が範囲外です: {index}")
+        if pool.card_state[sid, index] != CARD_HIDDEN:
+            return
+        selected = pool.selected[sid]
+        slot = 0 if selected[0] == NO_CARD else 1
+        if selected[slot] != NO_CARD:
+            return
+        pool.card_state[sid, index] = CARD_FLIPPED
+        selected[slot] = index
+        if pool.flip_logs is not None:
+            pool.flip_logs[sid].append((self.get_elapsed_time(), index))
+        if pool.tone_player is not None:
+            pool.tone_player(NOTE_FREQUENCIES[self.deck.get_card(index)])
+
+    def check_match(self):
+        """選択された2枚のカードがマッチするか確認"""
+        pool, sid = self.pool, self.sid
+        idx1, idx2 = pool.selected[sid]
+        if idx2 == NO_CARD:
+            return None
+        if pool.deck[sid, idx1] == pool.deck[sid, idx2]:
+            pool.matches[sid] += 1
+            pool.card_state[sid, idx1] = CARD_MATCHED
+            pool.card_state[sid, idx2] = CARD_MATCHED
+            pool.selected[sid] = NO_CARD
+            return True
+        return False
+
+    def reset_unmatched_cards(self):
+        """マッチしなかったカードを裏返す"""
+        pool, sid = self.pool, self.sid
+        for idx in pool.selected[sid]:
+            if idx != NO_CARD:
+                pool.card_state[sid, idx] = CARD_HIDDEN
+        pool.selected[sid] = NO_CARD
+
+    def is_game_complete(self):
+        """ゲームが完了したか確認"""
+        return self.matches_found == self.card_count // 2
+
+    def is_time_up(self):
+        """時間切れかどうか確認"""
+        return self.get_time_left() == 0
+
+
+# ======================
+# メモリ使用量の計測
+# ======================
+def _deep_sizeof(obj, seen=None):
+    """オブジェクトが参照する全体のおおよそのバイト数"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen or isinstance(obj, (type, types.ModuleType)) or callable(obj):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(_deep_sizeof(item, seen) for item in obj)
+    elif hasattr(obj, "__dict__"):
+        size += _deep_sizeof(vars(obj), seen)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="セッションプールのメモリ使用量を表示")
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--cards", type=int, default=GameConstants.CARD_COUNT_4X4)
+    args = parser.parse_args()
+
+    pool = SessionPool(args.sessions, max_cards=args.cards, seed=0)
+    started = time.perf_counter()
+    sids = [pool.allocate(args.cards, GameConstants.DEFAULT_TIME_LIMIT) for _ in range(args.sessions)]
+    spent = time.perf_counter() - started
+    for sid in sids:
+        pool.free(sid)
+
+    from main import GameState
+    game_state = GameState(args.cards, GameConstants.DEFAULT_TIME_LIMIT, tone_player=None)
+    print(f"プール: {args.sessions} ゲームで {pool.nbytes() / 1e6:.1f}MB "
+          f"(1ゲームあたり {pool.bytes_per_session():.0f} バイト)")
+    print(f"GameState: 1ゲームあたり約 {_deep_sizeof(game_state)} バイト")
+    print(f"割り当て: 1ゲームあたり {spent / args.sessions * 1e6:.2f} マイクロ秒")
+
+
+if __name__ == "__main__":
+    main()
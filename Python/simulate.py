@@ -0,0 +1,118 @@
+import random
+from collections import deque
+
+from main import GameState, GameConstants
+import session_log
+
+
+# ======================
+# 仮想時計
+# ======================
+class VirtualClock:
+    """手動で進める時計（GameState の clock に渡す）"""
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        """時計を進める"""
+        self.now += seconds
+
+
+# ======================
+# プレイヤーの模擬
+# ======================
+class SimulatedPlayer:
+    """記憶力を持つプレイヤーの模擬（memory=None で完全記憶）"""
+    def __init__(self, game_state, rng, memory=None):
+        self.game_state = game_state
+        self.rng = rng
+        self.known = deque(maxlen=memory)  # (カード番号, 音階) 古い順
+
+    def _hidden(self, index):
+        return self.game_state.card_states[index] == "hidden"
+
+    def _remember(self, index):
+        note = self.game_state.deck.get_card(index)
+        if self._hidden(index) and all(i != index for i, _ in self.known):
+            self.known.append((index, note))
+
+    def _forget_matched(self):
+        for entry in [e for e in self.known if not self._hidden(e[0])]:
+            self.known.remove(entry)
+
+    def _known_partner(self, index):
+        note = self.game_state.deck.get_card(index)
+        for i, n in self.known:
+            if i != index and n == note and self._hidden(i):
+                return i
+        return None
+
+    def _known_pair(self):
+        for a, (i, n) in enumerate(self.known):
+            for j, m in list(self.known)[a + 1:]:
+                if n == m and self._hidden(i) and self._hidden(j):
+                    return i, j
+        return None
+
+    def _random_unknown(self, exclude=()):
+        known = {i for i, _ in self.known}
+        candidates = [i for i in range(self.game_state.card_count)
+                      if self._hidden(i) and i not in known and i not in exclude]
+        if not candidates:
+            candidates = [i for i in range(self.game_state.card_count)
+                          if self._hidden(i) and i not in exclude]
+        return self.rng.choice(candidates)
+
+    def choose_first(self):
+        """1枚目に選ぶカード"""
+        self._forget_matched()
+        pair = self._known_pair()
+        if pair is not None:
+            return pair[0]
+        return self._random_unknown()
+
+    def choose_second(self, first):
+        """2枚目に選ぶカード"""
+        partner = self._known_partner(first)
+        if partner is not None:
+            return partner
+        return self._random_unknown(exclude=(first,))
+
+    def observe(self, index):
+        """めくったカードを記憶（そろったカードは覚えない）"""
+        self._remember(index)
+
+
+def simulate_session(card_count=GameConstants.CARD_COUNT_4X4,
+                     time_limit=GameConstants.DEFAULT_TIME_LIMIT,
+                     seed=None, memory=None,
+                     flip_interval=GameConstants.DEFAULT_TONE_DURATION,
+                     mismatch_delay=0.5):
+    """GameState のルールで1ゲームを模擬し、記録を返す"""
+    rng = random.Random(seed)
+    clock = VirtualClock()
+    game_state = GameState(card_count, time_limit, clock=clock, tone_player=None, rng=rng)
+    player = SimulatedPlayer(game_state, rng, memory)
+
+    while not game_state.is_game_complete() and not game_state.is_time_up():
+        first = player.choose_first()
+        game_state.flip_card(first)
+        clock.advance(flip_interval)
+        if game_state.is_time_up():
+            break
+
+        # 1枚目の相手を思い出してから2枚目を選び、ターンが終わってから覚える
+        second = player.choose_second(first)
+        game_state.flip_card(second)
+        clock.advance(flip_interval)
+
+        if game_state.check_match() is False:
+            clock.advance(mismatch_delay)
+            game_state.reset_unmatched_cards()
+        player.observe(first)
+        player.observe(second)
+
+    return session_log.session_to_record(game_state)
@@ -0,0 +1,212 @@
+import logging
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+# ======================
+# スナップショット形式
+# ======================
+# リトルエンディアンのバイナリ形式
+#   ヘッダー   : MAGIC, バージョン, カード枚数, 音階数, 時間制限, そろった組数,
+#                一時停止中か, めくり記録の件数, 経過時間
+#   音階表     : 音階数 x (長さ 1バイト + ASCII 文字列)
+#   配列       : deck uint8[カード枚数] (音階表の番号)
+#                states uint8[カード枚数] (0 = 裏, 1 = めくり中, 2 = そろった)
+#                selected int8[2] (-1 = なし)
+#                flip_times float32[件数], flip_cards uint8[件数]
+MAGIC = b"SNBK"
+VERSION = 1
+HEADER = struct.Struct("<4sHBBHHBHd")
+
+CARD_HIDDEN = 0
+CARD_FLIPPED = 1
+CARD_MATCHED = 2
+NO_CARD = -1
+
+
+class Snapshot:
+    """デコード済みのスナップショット（配列は元のバッファを参照する）"""
+    def __init__(self, card_count, time_limit, matches_found, paused, elapsed,
+                 note_names, deck, states, selected, flip_times, flip_cards):
+        self.card_count = card_count
+        self.time_limit = time_limit
+        self.matches_found = matches_found
+        self.paused = paused
+        self.elapsed = elapsed
+        self.note_names = note_names
+        self.deck = deck
+        self.states = states
+        self.selected = selected
+        self.flip_times = flip_times
+        self.flip_cards = flip_cards
+
+    def cards(self):
+        """デッキを音階名のリストで返す"""
+        return [self.note_names[n] for n in self.deck]
+
+
+def encode(game_state):
+    """GameState をバイト列に変換"""
+    cards = game_state.deck.cards[:game_state.card_count]
+    note_names = sorted(set(cards))
+    note_index = {name: i for i, name in enumerate(note_names)}
+    states = [
+        CARD_MATCHED if value is not None else (CARD_HIDDEN if state == "hidden" else CARD_FLIPPED)
+        for state, value in zip(game_state.card_states, game_state.card_values)
+    ]
+    selected = (list(game_state.selected_cards) + [NO_CARD, NO_CARD])[:2]
+    flip_log = game_state.flip_log
+
+    parts = [HEADER.pack(MAGIC, VERSION, game_state.card_count, len(note_names),
+                         game_state.time_limit, game_state.matches_found,
+                         int(game_state.game_paused), len(flip_log),
+                         game_state.get_elapsed_time())]
+    for name in note_names:
+        raw = name.encode("ascii")
+        parts.append(bytes([len(raw)]) + raw)
+    parts.append(bytes(note_index[c] for c in cards))
+    parts.append(bytes(states))
+    parts.append(np.array(selected, dtype=np.int8).tobytes())
+    parts.append(np.array([t for t, _ in flip_log], dtype="<f4").tobytes())
+    parts.append(bytes(i for _, i in flip_log))
+    return b"".join(parts)
+
+
+def decode(data):
+    """バイト列から Snapshot を作成（配列はコピーしない）"""
+    buf = memoryview(data)
+    if len(buf) < HEADER.size:
+        raise ValueError("スナップショットが短すぎます")
+    (magic, version, card_count, note_count, time_limit, matches_found,
+     paused, flip_count, elapsed) = HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError("スナップショットではありません")
+    if version != VERSION:
+        raise ValueError(f"対応していないバージョンです: {version}")
+
+    if card_count == 0 or card_count % 2 or matches_found > card_count // 2:
+        raise ValueError("カード枚数かそろった組数が不正です")
+    if note_count == 0 or note_count > card_count // 2:
+        raise ValueError("音階数が不正です")
+
+    offset = HEADER.size
+    note_names = []
+    for _ in range(note_count):
+        if offset >= len(buf) or offset + 1 + buf[offset] > len(buf):
+            raise ValueError("音階表が途中で切れています")
+        length = buf[offset]
+        note_names.append(bytes(buf[offset + 1:offset + 1 + length]).decode("ascii"))
+        offset += 1 + length
+
+    def take(dtype, count):
+        nonlocal offset
+        size = np.dtype(dtype).itemsize * count
+        if offset + size > len(buf):
+            raise ValueError("スナップショットが途中で切れています")
+        array = np.frombuffer(buf, dtype=dtype, count=count, offset=offset)
+        offset += size
+        return array
+
+    deck = take(np.uint8, card_count)
+    states = take(np.uint8, card_count)
+    selected = take(np.int8, 2)
+    flip_times = take("<f4", flip_count)
+    flip_cards = take(np.uint8, flip_count)
+    if offset != len(buf):
+        raise ValueError("スナップショットの後ろに余分なデータがあります")
+
+    # 番号が範囲内か確かめる（壊れたファイルで IndexError にならないように）
+    if deck.size and deck.max() >= note_count:
+        raise ValueError("デッキの音階番号が範囲外です")
+    if states.size and states.max() > CARD_MATCHED:
+        raise ValueError("カードの状態が不正です")
+    chosen = [int(i) for i in selected if i != NO_CARD]
+    if any(not 0 <= i < card_count for i in chosen) or len(set(chosen)) != len(chosen):
+        raise ValueError("選択中のカード番号が不正です")
+    if flip_cards.size and flip_cards.max() >= card_count:
+        raise ValueError("めくり記録のカード番号が範囲外です")
+    return Snapshot(card_count, time_limit, matches_found, bool(paused), elapsed,
+                    note_names, deck, states, selected, flip_times, flip_cards)
+
+
+def apply_snapshot(game_state, snapshot):
+    """GameState をスナップショットの状態に戻す"""
+    game_state.deck.cards = snapshot.cards()
+    game_state.card_states = ["hidden" if s == CARD_HIDDEN else "flipped" for s in snapshot.states]
+    game_state.card_values = [
+        snapshot.note_names[n] if s == CARD_MATCHED else None
+        for n, s in zip(snapshot.deck, snapshot.states)
+    ]
+    game_state.selected_cards = [int(i) for i in snapshot.selected if i != NO_CARD]
+    game_state.matches_found = snapshot.matches_found
+    game_state.flip_log = [(float(t), int(i)) for t, i in zip(snapshot.flip_times, snapshot.flip_cards)]
+
+    now = game_state.clock()
+    game_state.start_time = now - snapshot.elapsed
+    game_state.paused_time = 0
+    game_state.game_paused = snapshot.paused
+    game_state.pause_start_time = now if snapshot.paused else 0
+    return game_state
+
+
+# ======================
+# ファイル入出力
+# ======================
+def write_atomic(path, data):
+    """一時ファイルに書いてから置き換える（途中で落ちても壊れない）"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load(path):
+    """ファイルからスナップショットを読み込む"""
+    with open(path, "rb") as f:
+        return decode(f.read())
+
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotWriter:
+    """ゲームループを止めずにスナップショットを保存する"""
+    def __init__(self, path):
+        self.path = path
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.failures = 0  # 保存・削除に失敗した回数
+        self.last_error = None
+
+    def save(self, game_state):
+        """状態をその場でエンコードし、書き込みは別スレッドで行う"""
+        future = self.executor.submit(write_atomic, self.path, encode(game_state))
+        future.add_done_callback(lambda f: self._check(f, "保存"))
+
+    def discard(self):
+        """保存済みのスナップショットを削除"""
+        future = self.executor.submit(self._remove)
+        future.add_done_callback(lambda f: self._check(f, "削除"))
+
+    def _check(self, future, action):
+        """別スレッドでの失敗を記録してログに残す（ゲームは続ける）"""
+        error = future.exception()
+        if error is None:
+            return
+        self.failures += 1
+        self.last_error = error
+        logger.error("スナップショットの%sに失敗しました: %s", action, error)
+
+    def _remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        """書き込み待ちを終えてから終了"""
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,334 @@
+import argparse
+import time
+from bisect import bisect_left
+from collections import Counter
+from math import gcd
+
+import numpy as np
+
+from main import GameConstants, NOTE_FREQUENCIES
+
+
+# ======================
+# 難易度ソルバー
+# ======================
+# simulate.SimulatedPlayer と同じプレイヤーを盤面の状態遷移としてモデル化して解く。
+# 状態は (free, known) の組で、音階ごとの「正体を覚えていないカードの枚数 r」で表す。
+#   - free:  覚えているカードがない音階の r (偶数) の多重集合 (昇順のタプル)
+#   - known: 覚えているカードが1枚ある音階の r (奇数)。memory を指定したときは
+#            覚えた順 (古い順)、完全記憶のときは昇順のタプル
+# GameState.check_match は同じ音階なら どの2枚でも そろうので、6x6 のように
+# 同じ音階が 4 枚・6 枚ある盤面も音階ごとに数える。
+# 1ターン = 2枚めくる。プレイヤーはまず覚えていないカードを1枚めくり、
+#   - 覚えているカードと同じ音階なら、覚えている方をめくってそろえる
+#   - 新しい音階なら、もう1枚覚えていないカードをめくる (guess) か、
+#     覚えているカードをめくって情報を増やさない (safe) かを選ぶ
+# そろわなかったカードは 1枚目、2枚目の順に覚え、memory 枚を超えた分は
+# SimulatedPlayer の deque(maxlen=memory) と同じく古いものから忘れる。
+# 忘れると盤面が元に近い状態へ戻るので、状態遷移は閉路を含む。そのため
+# 到達できる状態を先に列挙し、価値反復とめくり時間ごとの確率の前進計算で解く。
+# 状態数は盤面と memory が大きいほど急に増える。完全記憶で 36 枚は約 1800 状態で
+# 0.2 秒ほど、64 枚は約 1.3 万状態で 2 秒ほど。100 枚では 28 万状態になり 1 分近く
+# かかるので、対話的に使えるのは 64 枚程度までとする。
+GUESS = "guess"
+SAFE = "safe"
+
+TOLERANCE = 1e-10  # 価値反復の収束判定
+MAX_ITERATIONS = 100000
+
+
+def _remove(values, value):
+    """タプルから value を1つ取り除く"""
+    i = values.index(value)
+    return values[:i] + values[i + 1:]
+
+
+def _insert(values, value):
+    """昇順のタプルに value を加える（0 の音階は除く）"""
+    if not value:
+        return values
+    i = bisect_left(values, value)
+    return values[:i] + (value,) + values[i:]
+
+
+def initial_state(card_count):
+    """CardDeck と同じ配り方での開始状態（音階ごとの枚数）"""
+    notes = list(NOTE_FREQUENCIES.keys())
+    pairs = Counter(notes[i % len(notes)] for i in range(card_count // 2))
+    return tuple(sorted(2 * count for count in pairs.values())), ()
+
+
+class _Model:
+    """1つの盤面サイズで到達できる状態と遷移（numpy 配列）"""
+    def __init__(self, states, edges):
+        self.states = states
+        self.index = {state: i for i, state in enumerate(states)}
+        # edges: choice → (遷移元, 遷移先, 確率, めくり回数, 不一致回数) の配列
+        self.edges = {}
+        for choice, rows in edges.items():
+            table = np.array(rows, dtype=float).reshape(-1, 5)
+            src, dst, p, flips, misses = table.T
+            self.edges[choice] = (src.astype(np.intp), dst.astype(np.intp), p, flips, misses)
+        self.values = None  # 状態ごとの期待めくり回数・期待不一致回数
+        self.choices = None  # 状態ごとの選択 (True = safe)
+        self.distributions = {}
+
+
+class DifficultySolver:
+    """SimulatedPlayer と同じ記憶のしかたで、期待手数と時間内にクリアできる確率を計算"""
+    def __init__(self, memory=None, flip_seconds=GameConstants.DEFAULT_TONE_DURATION,
+                 miss_seconds=0.5, resolution=0.1):
+        if memory is not None and memory < 0:
+            raise ValueError(f"memory must be non-negative: {memory}")
+        self.memory = memory
+        self.flip_seconds = flip_seconds
+        self.miss_seconds = miss_seconds
+        self.resolution = resolution
+        self.flip_ticks = round(flip_seconds / resolution)
+        self.miss_ticks = round(miss_seconds / resolution)
+        self._models = {}
+
+    # --- 状態遷移 ---
+    def _observe(self, free, known):
+        """見たカードを覚えた後の状態（あふれた分は古い方から忘れる）"""
+        if self.memory is None:
+            return free, tuple(sorted(known))
+        overflow = len(known) - self.memory
+        if overflow > 0:
+            for r in known[:overflow]:
+                free = _insert(free, r + 1)
+            known = known[overflow:]
+        return free, tuple(known)
+
+    def _observe_pair(self, free, known, pos, new_r):
+        """2枚目が覚えているカード known[pos] と同じ音階だったときの (状態, めくり, 不一致)"""
+        r2 = known[pos]
+        # 2枚とも覚えた時点であふれる分（そろえる前に忘れる）
+        overflow = 0 if self.memory is None else max(len(known) + 2 - self.memory, 0)
+        if overflow > pos:
+            # 前に覚えていた方を忘れた → 今見た方だけを覚えている
+            entries = known[:pos] + known[pos + 1:] + (new_r,)
+            for r in entries[:overflow - 1]:
+                free = _insert(free, r + 1)
+            return (free, entries[overflow - 1:] + (r2,)), 2, 1
+        # 同じ音階の2枚を覚えている → 次のターンでそろえる
+        for r in known[:overflow]:
+            free = _insert(free, r + 1)
+        rest = known[overflow:pos] + known[pos + 1:] + (new_r,)
+        if self.memory is None:
+            rest = tuple(sorted(rest))
+        return (_insert(free, r2 - 1), rest), 4, 1
+
+    def _known_slots(self, known):
+        """覚えている音階ごとの (位置, r, 同じ扱いになる音階の数)"""
+        if self.memory is None:
+            for r, count in Counter(known).items():
+                yield known.index(r), r, count
+        else:
+            for pos, r in enumerate(known):
+                yield pos, r, 1
+
+    def _outcomes(self, state, choice):
+        """(確率, 次の状態, めくり回数, 不一致回数) のリスト"""
+        free, known = state
+        unseen = sum(free) + sum(known)
+        outcomes = []
+        for pos, r, count in self._known_slots(known):
+            # 覚えているカードと同じ音階 → そろえる
+            outcomes.append((count * r / unseen,
+                             (_insert(free, r - 1), known[:pos] + known[pos + 1:]), 2, 0))
+        rest = unseen - 1
+        counts = Counter(free)
+        for r, count in counts.items():
+            first = count * r / unseen
+            after_first = _remove(free, r)
+            if choice == SAFE:
+                outcomes.append((first, self._observe(after_first, known + (r - 1,)), 2, 1))
+                continue
+            outcomes.append((first * (r - 1) / rest, (_insert(after_first, r - 2), known), 2, 0))
+            for r2, count2 in counts.items():
+                count2 -= r2 == r
+                if not count2:
+                    continue
+                second = first * count2 * r2 / rest
+                outcomes.append((second, self._observe(_remove(after_first, r2),
+                                                       known + (r - 1, r2 - 1)), 2, 1))
+            for pos, r2, count2 in self._known_slots(known):
+                second = first * count2 * r2 / rest
+                next_state, flips, misses = self._observe_pair(after_first, known, pos, r - 1)
+                outcomes.append((second, next_state, flips, misses))
+        return outcomes
+
+    def _build(self, card_count):
+        """到達できる状態を列挙して遷移を配列にまとめる"""
+        start = initial_state(card_count)
+        states = [((), ()), start] if start != ((), ()) else [start]
+        index = {state: i for i, state in enumerate(states)}
+        edges = {GUESS: [], SAFE: []}
+        i = 1
+        while i < len(states):
+            state = states[i]
+            choices = (GUESS, SAFE) if state[1] else (GUESS,)
+            for choice in choices:
+                rows = edges[choice]
+                for p, next_state, flips, misses in self._outcomes(state, choice):
+                    j = index.get(next_state)
+                    if j is None:
+                        j = index[next_state] = len(states)
+                        states.append(next_state)
+                    rows.append((i, j, p, flips, misses))
+            i += 1
+        return _Model(states, edges)
+
+    # --- 解く ---
+    def _model(self, card_count):
+        model = self._models.get(card_count)
+        if model is None:
+            model = self._build(card_count)
+            self._solve(model)
+            self._models[card_count] = model
+        return model
+
+    def _solve(self, model):
+        """価値反復で期待時間が最小になる選択と、そのときの期待値を求める"""
+        n = len(model.states)
+        costs = {}
+        for choice, (src, dst, p, flips, misses) in model.edges.items():
+            seconds = flips * self.flip_seconds + misses * self.miss_seconds
+            costs[choice] = np.bincount(src, p * seconds, minlength=n)
+        has_safe = np.zeros(n, dtype=bool)
+        has_safe[model.edges[SAFE][0]] = True
+
+        value = np.zeros(n)
+        for _ in range(MAX_ITERATIONS):
+            guess = self._step(model.edges[GUESS], costs[GUESS], value, n)
+            safe = np.where(has_safe, self._step(model.edges[SAFE], costs[SAFE], value, n), np.inf)
+            updated = np.minimum(guess, safe)
+            converged = np.max(np.abs(updated - value)) < TOLERANCE
+            value = updated
+            if converged:
+                break
+        model.choices = has_safe & (safe < guess - TOLERANCE)
+
+        # 決めた選択でのめくり回数・不一致回数の期待値
+        edges = self._policy_edges(model)
+        src, dst, p, flips, misses = edges
+        counts = np.stack([np.bincount(src, p * flips, minlength=n),
+                           np.bincount(src, p * misses, minlength=n)], axis=1)
+        values = np.zeros((n, 2))
+        for _ in range(MAX_ITERATIONS):
+            updated = counts.copy()
+            for column in range(2):
+                updated[:, column] += np.bincount(src, p * values[dst, column], minlength=n)
+            converged = np.max(np.abs(updated - values)) < TOLERANCE
+            values = updated
+            if converged:
+                break
+        model.values = values
+
+    @staticmethod
+    def _step(edges, cost, value, n):
+        src, dst, p, _, _ = edges
+        return cost + np.bincount(src, p * value[dst], minlength=n)
+
+    def _policy_edges(self, model):
+        """各状態で選んだ方の遷移だけを集めた配列"""
+        columns = []
+        guess = model.edges[GUESS]
+        safe = model.edges[SAFE]
+        keep_guess = ~model.choices[guess[0]]
+        keep_safe = model.choices[safe[0]]
+        for g, s in zip(guess, safe):
+            columns.append(np.concatenate([g[keep_guess], s[keep_safe]]))
+        return tuple(columns)
+
+    # --- 公開 API ---
+    def expected_flips(self, card_count):
+        """クリアまでに必要なめくり回数の期待値"""
+        model = self._model(card_count)
+        return float(model.values[model.index[initial_state(card_count)], 0])
+
+    def expected_seconds(self, card_count):
+        """クリアまでに必要な時間の期待値（秒）"""
+        model = self._model(card_count)
+        flips, misses = model.values[model.index[initial_state(card_count)]]
+        return float(flips * self.flip_seconds + misses * self.miss_seconds)
+
+    def time_distribution(self, card_count, time_limit):
+        """クリアにかかる時間の分布 (resolution 秒刻み、time_limit まで)"""
+        length = int(round(time_limit / self.resolution)) + 1
+        model = self._model(card_count)
+        cached = model.distributions.get(length)
+        if cached is None:
+            cached = model.distributions[length] = self._distribution(model, card_count, length)
+        return cached
+
+    def win_probability(self, card_count, time_limit):
+        """時間制限内にクリアできる確率"""
+        return float(self.time_distribution(card_count, time_limit).sum())
+
+    def _distribution(self, model, card_count, length):
+        """開始状態から確率を時間順に流し、終了状態に届いた時刻の分布を求める"""
+        n = len(model.states)
+        src, dst, p, flips, misses = self._policy_edges(model)
+        ticks = flips * self.flip_ticks + misses * self.miss_ticks
+        unit = gcd(*(int(t) for t in np.unique(ticks))) or 1
+        steps = (length - 1) // unit + 1
+        by_cost = [(int(cost) // unit, src[ticks == cost], dst[ticks == cost], p[ticks == cost])
+                   for cost in np.unique(ticks)]
+
+        mass = np.zeros((steps, n))
+        mass[0, model.index[initial_state(card_count)]] = 1.0
+        finished = model.index[((), ())]
+        result = np.zeros(length)
+        for t in range(steps):
+            current = mass[t]
+            result[t * unit] = current[finished]
+            current[finished] = 0.0
+            for cost, edge_src, edge_dst, edge_p in by_cost:
+                if t + cost < steps:
+                    mass[t + cost] += np.bincount(edge_dst, edge_p * current[edge_src], minlength=n)
+        return result
+
+    def policy(self, card_count, state=None):
+        """状態 (free, known) で新しいカードを引いたときの最適な選択（省略時は開始状態）"""
+        model = self._model(card_count)
+        if state is None:
+            state = initial_state(card_count)
+        return SAFE if model.choices[model.index[state]] else GUESS
+
+
+# ======================
+# コマンドライン
+# ======================
+def main():
+    parser = argparse.ArgumentParser(description="盤面サイズと時間制限ごとの難易度を計算")
+    parser.add_argument("--cards", type=int, nargs="+",
+                        default=[GameConstants.CARD_COUNT_4X4, GameConstants.CARD_COUNT_6X6])
+    parser.add_argument("--memory", type=int, help="覚えていられるカードの枚数（省略時は完全記憶）")
+    parser.add_argument("--time-limit", type=int, nargs="+", default=[GameConstants.DEFAULT_TIME_LIMIT])
+    parser.add_argument("--flip-seconds", type=float, default=GameConstants.DEFAULT_TONE_DURATION,
+                        help="1枚めくるのにかかる時間（音の長さを含む）")
+    parser.add_argument("--miss-seconds", type=float, default=0.5, help="不一致のときの待ち時間")
+    parser.add_argument("--target", type=float, help="この確率でクリアできる最短の時間制限を探す")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    solver = DifficultySolver(args.memory, args.flip_seconds, args.miss_seconds)
+    for cards in args.cards:
+        print(f"{cards}枚: 期待めくり回数 {solver.expected_flips(cards):.2f}  "
+              f"期待時間 {solver.expected_seconds(cards):.1f}秒")
+        for limit in args.time_limit:
+            print(f"  制限 {limit}秒: クリア確率 {solver.win_probability(cards, limit):.3f}")
+        if args.target is not None:
+            limits = range(GameConstants.MIN_TIME_LIMIT, GameConstants.MAX_TIME_LIMIT + 1,
+                           GameConstants.TIME_ADJUST_STEP)
+            found = next((limit for limit in limits
+                          if solver.win_probability(cards, limit) >= args.target), None)
+            print(f"  クリア確率 {args.target} 以上の最短制限: "
+                  f"{'なし' if found is None else f'{found}秒'}")
+    print(f"計算時間: {time.perf_counter() - started:.3f}秒")
+
+
+if __name__ == "__main__":
+    main()
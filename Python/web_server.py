@@ -0,0 +1,361 @@
+import argparse
+import hashlib
+import http.client
+import json
+import mimetypes
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from main import CardDeck, GameConstants, NOTE_FREQUENCIES, generate_tone
+import leaderboard
+
+
+# ======================
+# Web フロントエンド用サーバー
+# ======================
+# GET  /                      Web/ の静的ファイル (ETag で再検証)
+# GET  /api/notes             音階の一覧と PCM の URL
+# GET  /api/tones/<音階>.f32  float32 リトルエンディアンの PCM (immutable)
+# GET  /api/deck?cards=16     シード付きの URL へリダイレクト
+# GET  /api/deck?cards=16&seed=N  シードから決まるデッキ (immutable)
+# GET  /api/scores?cards=16&time_limit=60  上位記録
+# POST /api/scores            スコアの登録 (まとめて書き込む)
+WEB_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Web")
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+CACHE_NONE = "no-store"
+
+
+class Asset:
+    """事前に用意したレスポンス本体と ETag"""
+    def __init__(self, body, content_type, cache_control):
+        self.body = body
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = f'"{self.digest}"'
+
+
+def _json_bytes(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class AssetStore:
+    """音の PCM・静的ファイル・デッキをまとめて用意しておく"""
+    MAX_DECKS = 4096
+
+    def __init__(self, web_root=WEB_ROOT):
+        self.web_root = web_root
+        self.tones = {}
+        notes = []
+        for name, frequency in NOTE_FREQUENCIES.items():
+            pcm = generate_tone(frequency).astype("<f4").tobytes()
+            asset = Asset(pcm, "application/octet-stream", CACHE_IMMUTABLE)
+            self.tones[name] = asset
+            # 内容のハッシュを URL に含めるので、音が変わればブラウザは新しい URL を取りに行く
+            notes.append({"name": name, "frequency": frequency,
+                          "url": f"/api/tones/{name}.f32?v={asset.digest[:12]}"})
+        self.notes = Asset(_json_bytes({
+            "sample_rate": GameConstants.DEFAULT_SAMPLE_RATE,
+            "duration": GameConstants.DEFAULT_TONE_DURATION,
+            "amplitude": GameConstants.DEFAULT_TONE_AMPLITUDE,
+            "notes": notes,
+        }), "application/json", CACHE_REVALIDATE)
+        self._static = {}
+        self._decks = {}
+        self._lock = threading.Lock()
+
+    def static(self, path):
+        """Web/ 以下のファイル（読み込んだものは覚えておく）"""
+        asset = self._static.get(path)
+        if asset is not None:
+            return asset
+        full_path = os.path.realpath(os.path.join(self.web_root, path.lstrip("/")))
+        if not full_path.startswith(os.path.realpath(self.web_root) + os.sep) or not os.path.isfile(full_path):
+            return None
+        with open(full_path, "rb") as f:
+            body = f.read()
+        content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type.endswith("javascript"):
+            content_type += "; charset=utf-8"
+        asset = Asset(body, content_type, CACHE_REVALIDATE)
+        with self._lock:
+            self._static[path] = asset
+        return asset
+
+    def deck(self, card_count, seed):
+        """シードから決まるデッキ（同じシードなら同じ並び）"""
+        key = (card_count, seed)
+        asset = self._decks.get(key)
+        if asset is not None:
+            return asset
+        deck = CardDeck(card_count, random.Random(seed))
+        asset = Asset(_json_bytes({
+            "seed": seed,
+            "cards": deck.cards,
+            "frequencies": [NOTE_FREQUENCIES[name] for name in deck.cards],
+        }), "application/json", CACHE_IMMUTABLE)
+        with self._lock:
+            if len(self._decks) >= self.MAX_DECKS:
+                self._decks.clear()
+            self._decks[key] = asset
+        return asset
+
+
+# ======================
+# リクエスト処理
+# ======================
+class RequestHandler(BaseHTTPRequestHandler):
+    """API と静的ファイルを返すハンドラー"""
+    protocol_version = "HTTP/1.1"  # keep-alive
+    # ヘッダーと本体を1回で送る（Nagle と遅延 ACK の組み合わせで待たされないように）
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+    server_version = "SoundNervousBreakdown/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # --- レスポンス ---
+    def _send_asset(self, asset):
+        if self.headers.get("If-None-Match") == asset.etag:
+            self.send_response(304)
+            self.send_header("ETag", asset.etag)
+            self.send_header("Cache-Control", asset.cache_control)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", asset.content_type)
+        self.send_header("Content-Length", str(len(asset.body)))
+        self.send_header("ETag", asset.etag)
+        self.send_header("Cache-Control", asset.cache_control)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(asset.body)
+
+    def _send_json(self, status, value, cache_control=CACHE_NONE):
+        body = _json_bytes(value)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", cache_control)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _send_redirect(self, location):
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Cache-Control", CACHE_NONE)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _error(self, status, message):
+        self._send_json(status, {"error": message})
+
+    # --- GET ---
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        store = self.server.assets
+        try:
+            if url.path == "/api/notes":
+                self._send_asset(store.notes)
+            elif url.path.startswith("/api/tones/") and url.path.endswith(".f32"):
+                asset = store.tones.get(url.path[len("/api/tones/"):-len(".f32")])
+                if asset is None:
+                    self._error(404, "音階が見つかりません")
+                else:
+                    self._send_asset(asset)
+            elif url.path == "/api/deck":
+                card_count = self._card_count(query)
+                if "seed" not in query:
+                    self._send_redirect(f"/api/deck?cards={card_count}&seed={random.getrandbits(31)}")
+                else:
+                    self._send_asset(store.deck(card_count, int(query["seed"][0])))
+            elif url.path == "/api/scores":
+                card_count = self._card_count(query)
+                time_limit = int(query.get("time_limit", [GameConstants.DEFAULT_TIME_LIMIT])[0])
+                top = self.server.leaderboard.top(card_count, time_limit)
+                self._send_json(200, {"scores": [{"score": s, "time_used": t} for s, t in top]},
+                                CACHE_REVALIDATE)
+            else:
+                asset = store.static("/index.html" if url.path == "/" else url.path)
+                if asset is None:
+                    self._error(404, "見つかりません")
+                else:
+                    self._send_asset(asset)
+        except ValueError as e:
+            self._error(400, str(e))
+
+    def _card_count(self, query):
+        card_count = int(query.get("cards", [GameConstants.CARD_COUNT_4X4])[0])
+        if card_count not in (GameConstants.CARD_COUNT_4X4, GameConstants.CARD_COUNT_6X6):
+            raise ValueError("cards は 16 か 36 を指定してください")
+        return card_count
+
+    # --- POST ---
+    def do_POST(self):
+        if urlsplit(self.path).path != "/api/scores":
+            self._error(404, "見つかりません")
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length < 0:
+                raise ValueError("Content-Length が負です")
+            data = json.loads(self.rfile.read(length))
+            card_count = int(data["card_count"])
+            time_limit = int(data["time_limit"])
+            score = int(data["score"])
+            time_used = float(data["time_used"])
+        except (ValueError, KeyError, TypeError):
+            self._error(400, "スコアの形式が不正です")
+            return
+        if (card_count not in (GameConstants.CARD_COUNT_4X4, GameConstants.CARD_COUNT_6X6)
+                or not GameConstants.MIN_TIME_LIMIT <= time_limit <= GameConstants.MAX_TIME_LIMIT
+                or not 0 <= score <= card_count // 2
+                or not 0 <= time_used <= time_limit):
+            self._error(400, "スコアが範囲外です")
+            return
+        self.server.leaderboard.submit(card_count, time_limit, score, time_used)
+        self._send_json(202, {"accepted": True})
+
+
+class WebServer(ThreadingHTTPServer):
+    """用意済みの資産とランキングを持つ HTTP サーバー"""
+    daemon_threads = True
+
+    def __init__(self, address, leaderboard_path=GameConstants.LEADERBOARD_PATH, verbose=False):
+        super().__init__(address, RequestHandler)
+        self.assets = AssetStore()
+        self.leaderboard = leaderboard.Leaderboard(leaderboard_path)
+        self.verbose = verbose
+
+    def server_close(self):
+        super().server_close()
+        self.leaderboard.close()
+
+
+# ======================
+# 負荷試験
+# ======================
+def run_load_test(host, port, threads=8, requests_per_thread=2000):
+    """localhost のサーバーに keep-alive で GET / POST を送り、毎秒のリクエスト数を返す"""
+    counts = {"ok": 0, "not_modified": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def worker(index):
+        rng = random.Random(index)
+        connection = http.client.HTTPConnection(host, port)
+        etags = {}
+        local = {"ok": 0, "not_modified": 0, "errors": 0}
+        for i in range(requests_per_thread):
+            kind = i % 4
+            headers = {}
+            if kind == 0:
+                path = "/api/notes"
+            elif kind == 1:
+                path = f"/api/tones/{rng.choice(list(NOTE_FREQUENCIES))}.f32"
+            elif kind == 2:
+                path = f"/api/deck?cards=16&seed={rng.randrange(64)}"
+            else:
+                body = json.dumps({"card_count": 16, "time_limit": 60,
+                                   "score": rng.randrange(9), "time_used": rng.uniform(5, 60)})
+                connection.request("POST", "/api/scores", body, {"Content-Type": "application/json"})
+                response = connection.getresponse()
+                response.read()
+                local["ok" if response.status == 202 else "errors"] += 1
+                continue
+            if path in etags:
+                headers["If-None-Match"] = etags[path]
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status == 200:
+                etags[path] = response.getheader("ETag")
+                local["ok"] += 1
+            elif response.status == 304:
+                local["not_modified"] += 1
+            else:
+                local["errors"] += 1
+        connection.close()
+        with lock:
+            for key, value in local.items():
+                counts[key] += value
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    spent = time.perf_counter() - started
+    return counts, sum(counts.values()) / spent
+
+
+# ======================
+# コマンドライン
+# ======================
+def main():
+    parser = argparse.ArgumentParser(description="Web 版のためのローカルサーバー")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--leaderboard", 
+                        help="ランキングのデータベース（省略時は通常のもの、--bench では使い捨ての一時ファイル）")
+    parser.add_argument("--verbose", action="store_true", help="アクセスログを表示")
+    parser.add_argument("--bench", action="store_true", help="自分自身に負荷試験をして終了")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000, help="スレッドごとのリクエスト数")
+    args = parser.parse_args()
+
+    # 負荷試験の偽のスコアが本物のランキングに混ざらないようにする
+    temp_dir = None
+    leaderboard_path = args.leaderboard
+    if leaderboard_path is None:
+        if args.bench:
+            temp_dir = tempfile.mkdtemp(prefix="onkai_bench_")
+            leaderboard_path = os.path.join(temp_dir, "leaderboard.db")
+        else:
+            leaderboard_path = GameConstants.LEADERBOARD_PATH
+
+    server = WebServer((args.host, 0 if args.bench else args.port), leaderboard_path, args.verbose)
+    host, port = server.server_address[:2]
+    if not args.bench:
+        print(f"http://{host}:{port}/ で待ち受け中")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        counts, rate = run_load_test(host, port, args.threads, args.requests)
+    finally:
+        server.shutdown()
+        server.server_close()
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    print(f"200/202: {counts['ok']}  304: {counts['not_modified']}  エラー: {counts['errors']}")
+    print(f"{rate:.0f} リクエスト/秒")
+
+
+if __name__ == "__main__":
+    main()
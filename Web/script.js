@@ -34,12 +34,19 @@ const NOTE_FREQUENCIES = {
     "ド(高)": 523.25
 };
 
+// 周波数から音階名を引く表（サーバーのデッキの変換に使う）
+const FREQUENCY_NOTES = Object.fromEntries(
+    Object.entries(NOTE_FREQUENCIES).map(([note, frequency]) => [frequency.toFixed(2), note])
+);
+
 // ======================================
 // 音声再生クラス
 // ======================================
 class AudioPlayer {
     constructor() {
         this.audioContext = null;
+        this.toneBuffers = new Map();  // 周波数 → AudioBuffer（一度だけデコードして使い回す）
+        this.toneAmplitude = 1;
         this.initAudioContext();
     }
     
@@ -51,23 +58,93 @@ class AudioPlayer {
         }
     }
     
+    async loadTones(manifest) {
+        if (!this.audioContext) return;
+        
+        // サーバーの PCM は float32 リトルエンディアン
+        this.toneAmplitude = manifest.amplitude;
+        await Promise.all(manifest.notes.map(async (note) => {
+            const response = await fetch(note.url);
+            const pcm = new Float32Array(await response.arrayBuffer());
+            const buffer = this.audioContext.createBuffer(1, pcm.length, manifest.sample_rate);
+            buffer.copyToChannel(pcm, 0);
+            this.toneBuffers.set(note.frequency.toFixed(2), buffer);
+        }));
+    }
+    
     playTone(frequency, duration = GameConstants.TONE_DURATION) {
         if (!this.audioContext) return;
         
-        const oscillator = this.audioContext.createOscillator();
+        const buffer = this.toneBuffers.get(frequency.toFixed(2));
         const gainNode = this.audioContext.createGain();
+        let source;
+        let peak = GameConstants.TONE_AMPLITUDE;
+        
+        if (buffer) {
+            source = this.audioContext.createBufferSource();
+            source.buffer = buffer;
+            peak = GameConstants.TONE_AMPLITUDE / this.toneAmplitude;
+        } else {
+            source = this.audioContext.createOscillator();
+            source.frequency.value = frequency;
+            source.type = 'sine';
+        }
         
-        oscillator.connect(gainNode);
+        source.connect(gainNode);
         gainNode.connect(this.audioContext.destination);
         
-        oscillator.frequency.value = frequency;
-        oscillator.type = 'sine';
+        gainNode.gain.setValueAtTime(peak, this.audioContext.currentTime);
+        gainNode.gain.exponentialRampToValueAtTime(0.01 * peak, this.audioContext.currentTime + duration);
         
-        gainNode.gain.setValueAtTime(GameConstants.TONE_AMPLITUDE, this.audioContext.currentTime);
-        gainNode.gain.exponentialRampToValueAtTime(0.01, this.audioContext.currentTime + duration);
+        source.start(this.audioContext.currentTime);
+        source.stop(this.audioContext.currentTime + duration);
+    }
+}
+
+// ======================================
+// サーバー連携クラス（Python/web_server.py から配信された場合のみ）
+// ======================================
+class BackendClient {
+    constructor() {
+        this.available = false;
+    }
+    
+    async connect(audioPlayer) {
+        if (!location.protocol.startsWith('http')) return;
         
-        oscillator.start(this.audioContext.currentTime);
-        oscillator.stop(this.audioContext.currentTime + duration);
+        try {
+            const response = await fetch('/api/notes');
+            if (!response.ok) return;
+            await audioPlayer.loadTones(await response.json());
+            this.available = true;
+        } catch (e) {
+            console.warn("Backend not available", e);
+        }
+    }
+    
+    async fetchDeck(cardCount) {
+        if (!this.available) return null;
+        
+        try {
+            const response = await fetch(`/api/deck?cards=${cardCount}`);
+            if (!response.ok) return null;
+            const deck = await response.json();
+            return deck.frequencies.map((frequency) => FREQUENCY_NOTES[frequency.toFixed(2)]);
+        } catch (e) {
+            console.warn("Failed to fetch deck", e);
+            return null;
+        }
+    }
+    
+    submitScore(result) {
+        if (!this.available) return;
+        
+        fetch('/api/scores', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(result),
+            keepalive: true
+        }).catch((e) => console.warn("Failed to submit score", e));
     }
 }
 
@@ -75,9 +152,9 @@ class AudioPlayer {
 // カードデッキクラス
 // ======================================
 class CardDeck {
-    constructor(numCards) {
+    constructor(numCards, cards = null) {
         this.numCards = numCards;
-        this.cards = this.shuffle();
+        this.cards = cards || this.shuffle();
     }
     
     shuffle() {
@@ -111,10 +188,10 @@ class CardDeck {
 // ゲーム状態管理クラス
 // ======================================
 class GameState {
-    constructor(cardCount, timeLimit) {
+    constructor(cardCount, timeLimit, cards = null) {
         this.cardCount = cardCount;
         this.timeLimit = timeLimit;
-        this.deck = new CardDeck(cardCount);
+        this.deck = new CardDeck(cardCount, cards);
         this.cardStates = new Array(cardCount).fill('hidden');
         this.selectedCards = [];
         this.matchesFound = 0;
@@ -192,6 +269,8 @@ class GameState {
 class GameManager {
     constructor() {
         this.audioPlayer = new AudioPlayer();
+        this.backend = new BackendClient();
+        this.backend.connect(this.audioPlayer);
         this.gameState = null;
         this.cardCount = GameConstants.CARD_COUNT_4X4;
         this.timeLimit = GameConstants.DEFAULT_TIME_LIMIT;
@@ -283,8 +362,18 @@ class GameManager {
         this.showScene('menu');
     }
     
-    startGame() {
-        this.gameState = new GameState(this.cardCount, this.timeLimit);
+    async startGame() {
+        // デッキ取得中の再クリックで2つのゲームが始まらないようにする
+        const btnStart = this.menuElements.btnStart;
+        if (btnStart.disabled) return;
+        btnStart.disabled = true;
+        let cards;
+        try {
+            cards = await this.backend.fetchDeck(this.cardCount);
+        } finally {
+            btnStart.disabled = false;
+        }
+        this.gameState = new GameState(this.cardCount, this.timeLimit, cards);
         this.setupGameBoard();
         this.showScene('game');
         this.startGameLoop();
@@ -406,6 +495,13 @@ class GameManager {
             clearInterval(this.gameState.timerInterval);
         }
         
+        this.backend.submitScore({
+            card_count: this.gameState.cardCount,
+            time_limit: this.gameState.timeLimit,
+            score: this.gameState.matchesFound,
+            time_used: Math.min(this.gameState.getElapsedTime(), this.gameState.timeLimit)
+        });
+        
         this.showScene('gameOver');
         
         setTimeout(() => {